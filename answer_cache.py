@@ -0,0 +1,51 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable
+
+
+CACHE_FORMAT_VERSION = 1
+
+
+def hash_files(paths: Iterable[Path]) -> str:
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+# On-disk answer store, one small JSON file per (day, part, class, input, source) combination
+class AnswerCache:
+    def __init__(self, root: Path):
+        self.root = root
+
+    @staticmethod
+    def make_key(day: int, part: int, class_name: str, input_bytes: bytes, source_paths: Iterable[Path],
+                 extra: str = '') -> str:
+        h = hashlib.sha256()
+        h.update(f'{CACHE_FORMAT_VERSION}|{day}|{part}|{class_name}|{extra}|'.encode('utf8'))
+        h.update(hashlib.sha256(input_bytes).digest())
+        h.update(hash_files(source_paths).encode('ascii'))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f'{key}.json'
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        try:
+            with path.open(mode='rt', encoding='utf8') as f:
+                return json.load(f)['answer']
+        except (ValueError, KeyError):
+            # corrupted entry, treat it as a miss and let it get overwritten
+            return None
+
+    def put(self, key: str, answer: str, day: int, part: int, elapsed: float):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with tmp_path.open(mode='wt', encoding='utf8', newline='\n') as f:
+            json.dump({'day': day, 'part': part, 'answer': answer, 'elapsed': elapsed}, f)
+        tmp_path.replace(path)
@@ -0,0 +1,357 @@
+import json
+import math
+import statistics
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from random import Random
+from typing import Literal, NamedTuple, Iterable
+
+from common import available_backends, set_backend
+from memo import find_memo_caches, clear_memo_caches
+from runner import load_solution, input_path, discover_days, parse_day_range, registry, load_fastest_variants, \
+    save_fastest_variants, load_generator
+
+
+class BenchResult(NamedTuple):
+    day: int
+    part: int
+    answer: str
+    samples_ns: list[int]
+
+    @property
+    def min(self) -> int:
+        return min(self.samples_ns)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples_ns)
+
+    @property
+    def p95(self) -> float:
+        if len(self.samples_ns) < 2:
+            return self.samples_ns[0]
+        return statistics.quantiles(self.samples_ns, n=20, method='inclusive')[18]
+
+    @property
+    def stddev(self) -> float:
+        if len(self.samples_ns) < 2:
+            return 0.0
+        return statistics.stdev(self.samples_ns)
+
+    @property
+    def key(self) -> str:
+        return f'd{self.day}p{self.part}'
+
+    def as_dict(self) -> dict:
+        return {'day': self.day, 'part': self.part, 'answer': self.answer, 'min_ns': self.min,
+                'median_ns': self.median, 'p95_ns': self.p95, 'stddev_ns': self.stddev,
+                'samples_ns': self.samples_ns}
+
+
+def bench_puzzle(day: int, part: Literal[1, 2], warmup: int = 1, repeats: int = 5, version: str = None,
+                 input_file: str = None) -> BenchResult:
+    s_instance = load_solution(day=day, version=version)
+    solve_method = s_instance.solve_part1 if part == 1 else s_instance.solve_part2
+    # every repetition starts with cold memoization caches, a warm one would make everything after the warmup free
+    memo_caches = find_memo_caches(type(s_instance))
+    with input_path(day=day, input_file=input_file).open(mode='rt', encoding='utf8', newline='\n') as f:
+        puzzle_input = f.read()
+    samples = []
+    answer = None
+    with redirect_stdout(StringIO()):
+        for _ in range(warmup):
+            clear_memo_caches(memo_caches)
+            # noinspection PyArgumentList
+            solve_method(input_str=puzzle_input)
+        for _ in range(repeats):
+            clear_memo_caches(memo_caches)
+            start_time = time.perf_counter_ns()
+            # noinspection PyArgumentList
+            answer = solve_method(input_str=puzzle_input)
+            samples.append(time.perf_counter_ns() - start_time)
+    return BenchResult(day, part, answer, samples)
+
+
+def format_ns(ns: float) -> str:
+    if ns >= 1e9:
+        return f'{ns / 1e9:.3f}s'
+    if ns >= 1e6:
+        return f'{ns / 1e6:.3f}ms'
+    if ns >= 1e3:
+        return f'{ns / 1e3:.1f}us'
+    return f'{ns:.0f}ns'
+
+
+def print_bench_table(results: Iterable[BenchResult]):
+    print(f'{"day":>4} {"part":>4} {"min":>11} {"median":>11} {"p95":>11} {"stddev":>11}')
+    for r in results:
+        print(f'{r.day:>4} {r.part:>4} {format_ns(r.min):>11} {format_ns(r.median):>11} {format_ns(r.p95):>11} '
+              f'{format_ns(r.stddev):>11}')
+
+
+def save_results(results: Iterable[BenchResult], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open(mode='wt', encoding='utf8', newline='\n') as f:
+        json.dump({r.key: r.as_dict() for r in results}, f, indent=2)
+
+
+def load_baseline(path: Path) -> dict[str, dict] | None:
+    # results saved by --save-baseline, checked before anything gets benchmarked
+    if not path.is_file():
+        print(f'Error: no baseline found at "{path}"')
+        return None
+    try:
+        with path.open(mode='rt', encoding='utf8') as f:
+            baseline = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f'Error: could not read baseline "{path}" ({e})')
+        return None
+    if not isinstance(baseline, dict):
+        print(f'Error: "{path}" is not a saved baseline')
+        return None
+    return baseline
+
+
+def find_regressions(results: Iterable[BenchResult], baseline: dict[str, dict], threshold: float) -> list[str]:
+    regressions = []
+    for r in results:
+        base = baseline.get(r.key)
+        # a median of 0 can't be beaten, there's nothing to compare it to
+        if base is None or not base.get('median_ns'):
+            continue
+        ratio = r.median / base['median_ns']
+        if ratio > 1 + threshold:
+            regressions.append(f'day {r.day} part {r.part}: median {format_ns(r.median)} vs baseline '
+                               f'{format_ns(base["median_ns"])} (+{(ratio - 1) * 100:.1f}%)')
+    return regressions
+
+
+def bench_backends(days: list[int], parts: Iterable[Literal[1, 2]], version: str, warmup: int, repeats: int) -> bool:
+    # Solutions use the array backend in a version of their own, that version gets benchmarked on every backend that
+    # can be loaded here
+    days = [day for day in days if registry.has_version(day, version)]
+    if not days:
+        print(f'Error: none of the days have a "{version}" version')
+        return False
+    backends = available_backends()
+    if len(backends) < 2:
+        print(f'Warning: only the {backends[0]} backend is available')
+    results: dict[tuple[int, int], dict[str, BenchResult]] = {}
+    try:
+        for day in days:
+            for part in parts:
+                for backend in backends:
+                    set_backend(backend)
+                    print(f'Benchmarking day {day} part {part} ({backend})')
+                    results.setdefault((day, part), {})[backend] = bench_puzzle(
+                        day=day, part=part, warmup=warmup, repeats=repeats, version=version)
+    finally:
+        set_backend('python')
+
+    # speedups are of each backend over the first one
+    header = [f'{b:>11}' for b in backends] + [f'{b + " gain":>11}' for b in backends[1:]]
+    print(f'{"day":>4} {"part":>4} {" ".join(header)}')
+    all_agree = True
+    for (day, part), by_backend in results.items():
+        base = by_backend[backends[0]]
+        row = [f'{format_ns(by_backend[b].median):>11}' for b in backends]
+        row += [f'{base.median / by_backend[b].median:>10.2f}x' for b in backends[1:]]
+        print(f'{day:>4} {part:>4} {" ".join(row)}')
+        if len({r.answer for r in by_backend.values()}) > 1:
+            print(f'Error: backends disagree on day {day} part {part}: '
+                  f'{", ".join(f"{b}={r.answer}" for b, r in by_backend.items())}')
+            all_agree = False
+    return all_agree
+
+
+def bench(args: list[str]) -> bool:
+    days = discover_days()
+    parts: tuple[Literal[1, 2], ...] = (1, 2)
+    warmup, repeats, threshold = 1, 5, 0.1
+    out_path: Path | None = None
+    baseline: dict[str, dict] | None = None
+    save_baseline_path: Path | None = None
+    record_history = True
+    backends = False
+    version: str | None = None
+    args_iter = iter(args)
+    for arg in args_iter:
+        arg = arg.lower()
+        if arg == '-w':
+            warmup = int(next(args_iter))
+        elif arg == '-n':
+            repeats = int(next(args_iter))
+        elif arg == '--out':
+            out_path = Path(next(args_iter))
+        elif arg == '--baseline':
+            baseline = load_baseline(Path(next(args_iter)))
+            if baseline is None:
+                return False
+        elif arg == '--save-baseline':
+            save_baseline_path = Path(next(args_iter))
+        elif arg == '--threshold':
+            threshold = float(next(args_iter))
+        elif arg == '--no-history':
+            record_history = False
+        elif arg == '--backends':
+            backends = True
+        elif arg == '--version':
+            version = next(args_iter)
+        elif arg.startswith('d') or arg == 'all':
+            days = parse_day_range(arg, discover_days())
+        elif arg.startswith('p'):
+            # noinspection PyTypeChecker
+            parts = (int(arg[1:]),)
+            if parts[0] not in (1, 2):
+                print(f'Error: part must equal 1 or 2 ({parts[0]})')
+                return False
+    if repeats < 1:
+        print('Error: need at least 1 repetition')
+        return False
+    if backends:
+        # medians per backend of the "backend" version unless another one is given, nothing gets recorded or
+        # compared against baselines
+        return bench_backends(days, parts, version or 'backend', warmup=warmup, repeats=repeats)
+
+    results = []
+    for day in days:
+        if not registry.has_version(day, version):
+            print(f'Skipping day {day}, it has no "{version}" version')
+            continue
+        # days fresh from `main.py new` get benchmarked as soon as their input is filled in
+        path = input_path(day=day)
+        if not path.is_file() or path.stat().st_size == 0:
+            print(f'Skipping day {day}, no input at "{path}" yet')
+            continue
+        for part in parts:
+            print(f'Benchmarking day {day} part {part}', '' if version is None else f' ({version})', sep='')
+            results.append(bench_puzzle(day=day, part=part, warmup=warmup, repeats=repeats, version=version))
+    print_bench_table(results)
+    if record_history:
+        # imported here, history needs this module first
+        from history import record_bench_results, report_slowdowns
+        record_bench_results(results, version=version)
+        report_slowdowns(days, parts, 'bench')
+    if out_path is not None:
+        save_results(results, out_path)
+    if save_baseline_path is not None:
+        save_results(results, save_baseline_path)
+    if baseline is not None:
+        regressions = find_regressions(results, baseline, threshold)
+        if regressions:
+            print(f'Regressions over {threshold * 100:.0f}% threshold:')
+            for line in regressions:
+                print(f'  {line}')
+            return False
+    return True
+
+
+def compare(args: list[str]) -> bool:
+    day: int | None = None
+    parts: tuple[Literal[1, 2], ...] = (1, 2)
+    warmup, repeats = 1, 3
+    args_iter = iter(args)
+    for arg in args_iter:
+        arg = arg.lower()
+        if arg == '-w':
+            warmup = int(next(args_iter))
+        elif arg == '-n':
+            repeats = int(next(args_iter))
+        elif arg.startswith('d'):
+            day = int(arg[1:])
+        elif arg.startswith('p'):
+            # noinspection PyTypeChecker
+            parts = (int(arg[1:]),)
+    entry = None if day is None else registry.get(day)
+    if entry is None:
+        print('Error: must specify an existing day')
+        return False
+    if len(entry.versions) < 2:
+        print(f'Day {day} has only one implementation ({", ".join(entry.class_names)}), nothing to compare')
+        return True
+
+    # imported here, history needs this module first
+    from history import record_bench_results
+    fastest = load_fastest_variants()
+    all_agree = True
+    for part in parts:
+        results: dict[str | None, BenchResult] = {}
+        for version in entry.versions:
+            print(f'Benchmarking day {day} part {part}', '' if version is None else f' ({version})', sep='')
+            results[version] = bench_puzzle(day=day, part=part, warmup=warmup, repeats=repeats, version=version)
+        for version, r in results.items():
+            record_bench_results([r], version=version)
+        print(f'{"variant":>12} {"min":>11} {"median":>11}  answer')
+        for version, r in results.items():
+            print(f'{version or "(base)":>12} {format_ns(r.min):>11} {format_ns(r.median):>11}  {r.answer}')
+        if len({r.answer for r in results.values()}) != 1:
+            print(f'Error: variants disagree on the answer for part {part}, not recording a winner')
+            all_agree = False
+            continue
+        winner = min(results, key=lambda v: results[v].median)
+        print(f'Fastest for part {part}: {winner or "(base)"}')
+        fastest[f'd{day}p{part}'] = winner
+    save_fastest_variants(fastest)
+    return all_agree
+
+
+def fit_growth_exponent(sizes: list[float], times: list[float]) -> float:
+    # slope of log(time) over log(size), t ~ size^k
+    return statistics.linear_regression([math.log(s) for s in sizes], [math.log(t) for t in times]).slope
+
+
+def scaling(args: list[str]):
+    day: int | None = None
+    parts: tuple[Literal[1, 2], ...] = (1, 2)
+    sizes = [50, 100, 200, 400]
+    seed, repeats = 0, 3
+    version: str | None = None
+    args_iter = iter(args)
+    for arg in args_iter:
+        arg = arg.lower()
+        if arg == '--sizes':
+            sizes = [int(s) for s in next(args_iter).split(',')]
+        elif arg == '--seed':
+            seed = int(next(args_iter))
+        elif arg == '-n':
+            repeats = int(next(args_iter))
+        elif arg == '--version':
+            version = next(args_iter)
+        elif arg.startswith('d'):
+            day = int(arg[1:])
+        elif arg.startswith('p'):
+            # noinspection PyTypeChecker
+            parts = (int(arg[1:]),)
+    generator = None if day is None else load_generator(day)
+    if generator is None:
+        print('Error: must specify a day that has an input generator')
+        return
+    s_instance = load_solution(day=day, version=version)
+    memo_caches = find_memo_caches(type(s_instance))
+
+    try:
+        inputs = [generator(size, Random(seed)) for size in sizes]
+    except NotImplementedError:
+        print(f'Error: the input generator of day {day} is not implemented yet')
+        return
+    for part in parts:
+        solve_method = s_instance.solve_part1 if part == 1 else s_instance.solve_part2
+        print(f'Scaling day {day} part {part}', '' if version is None else f' ({version})', sep='')
+        print(f'{"size":>8} {"bytes":>10} {"min":>11}')
+        times = []
+        for size, puzzle_input in zip(sizes, inputs):
+            samples = []
+            with redirect_stdout(StringIO()):
+                for _ in range(repeats):
+                    clear_memo_caches(memo_caches)
+                    start_time = time.perf_counter_ns()
+                    # noinspection PyArgumentList
+                    solve_method(input_str=puzzle_input)
+                    samples.append(time.perf_counter_ns() - start_time)
+            times.append(max(min(samples), 1))
+            print(f'{size:>8} {len(puzzle_input):>10} {format_ns(times[-1]):>11}')
+        if len(sizes) > 1:
+            print(f'growth exponent: {fit_growth_exponent([len(i) for i in inputs], times):.2f} in input bytes, '
+                  f'{fit_growth_exponent(sizes, times):.2f} in size')
@@ -1,10 +1,24 @@
+import os
 from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
 from enum import Enum
+from functools import wraps
 from io import StringIO
-from typing import Iterator, Union, Iterable, Generic, TypeVar, Sequence, Tuple
+from mmap import mmap
+from time import perf_counter
+from typing import Iterator, Union, Iterable, Generic, TypeVar, Sequence, Tuple, TextIO, Callable
+
+
+# raw puzzle input as handed to solutions that set Day.BYTES_INPUT, usually a read-only mmap of the input file
+BytesInput = Union[bytes, bytearray, mmap]
 
 
 class Day(ABC):
+    # Set to True in solutions that only consume their input through line_iterator(). The runner may then pass
+    # input_str as a memory-mapped BytesInput instead of a decoded str.
+    BYTES_INPUT: bool = False
+
     @abstractmethod
     def solve_part1(self, input_str: str) -> str:
         raise NotImplemented
@@ -14,13 +28,97 @@ class Day(ABC):
         raise NotImplemented
 
 
-def line_iterator(multiline_string: str, strip_newline: bool = True) -> Iterator[str]:
-    for line in StringIO(multiline_string):
+class StreamingDay(Day):
+    # Solutions that read their input strictly line by line. The runner can feed solve_stream_partN() straight from
+    # the open input file, the regular solve_partN() methods just split input_str into lines.
+    BYTES_INPUT = True
+
+    @abstractmethod
+    def solve_stream_part1(self, lines: Iterable[str]) -> str:
+        raise NotImplemented
+
+    @abstractmethod
+    def solve_stream_part2(self, lines: Iterable[str]) -> str:
+        raise NotImplemented
+
+    def solve_part1(self, input_str: str) -> str:
+        return self.solve_stream_part1(line_iterator(input_str))
+
+    def solve_part2(self, input_str: str) -> str:
+        return self.solve_stream_part2(line_iterator(input_str))
+
+
+PT = TypeVar('PT')
+
+
+class ParsedDay(Day, Generic[PT]):
+    # Solutions with a separate parse stage. The runner parses the input once and hands the result to both parts,
+    # calling prepare_parsed() before each of them.
+
+    # Set in solutions whose parsed input can be cached on disk, and bumped whenever what dump_parsed() returns changes
+    # shape. dump_parsed() has to return plain data that marshal can store (ints, floats, strs, bytes, tuples, lists,
+    # dicts), load_parsed() builds the parsed input back from it.
+    PARSED_FORMAT: int | None = None
+
+    @abstractmethod
+    def parse(self, input_str: str) -> PT:
+        raise NotImplemented
+
+    @abstractmethod
+    def solve_parsed_part1(self, parsed: PT) -> str:
+        raise NotImplemented
+
+    @abstractmethod
+    def solve_parsed_part2(self, parsed: PT) -> str:
+        raise NotImplemented
+
+    def prepare_parsed(self, parsed: PT) -> PT:
+        # solutions that mutate their parsed state must return a copy or reset it here
+        return parsed
+
+    def dump_parsed(self, parsed: PT) -> object:
+        raise NotImplementedError
+
+    def load_parsed(self, data: object) -> PT:
+        raise NotImplementedError
+
+    def solve_part1(self, input_str: str) -> str:
+        return self.solve_parsed_part1(self.parse(input_str))
+
+    def solve_part2(self, input_str: str) -> str:
+        return self.solve_parsed_part2(self.parse(input_str))
+
+
+def line_iterator(multiline_string: str | BytesInput | TextIO, strip_newline: bool = True) -> Iterator[str]:
+    if isinstance(multiline_string, str):
+        lines = StringIO(multiline_string)
+    elif isinstance(multiline_string, (bytes, bytearray, mmap)):
+        # decode one line at a time so the whole input never exists as a str
+        lines = (line.decode('utf8') for line in byte_line_iterator(multiline_string, strip_newline=False))
+    else:
+        # an open text file, read lazily
+        lines = multiline_string
+    if _counts is not None:
+        lines = _count_items(_counts, 'line_iterator lines', lines)
+    for line in lines:
         if strip_newline:
             line = line.rstrip('\r\n')
         yield line
 
 
+def byte_line_iterator(buffer: BytesInput, strip_newline: bool = True) -> Iterator[bytes]:
+    # only the yielded line gets copied out of the buffer, nothing is decoded
+    start, end = 0, len(buffer)
+    while start < end:
+        nl = buffer.find(b'\n', start)
+        stop = end if nl < 0 else nl + 1
+        line = buffer[start:stop]
+        if strip_newline:
+            line = line.rstrip(b'\r\n')
+        yield line
+        start = stop
+
+
 def batch_iterator(iterable: Iterable, n: int, allow_incomplete_batch: bool = True):
     # python 3.12 has itertools.batched(), but I'm still using 3.10 :(
     iterable = iter(iterable)
@@ -40,6 +138,85 @@ def batch_iterator(iterable: Iterable, n: int, allow_incomplete_batch: bool = Tr
             batch.clear()
 
 
+# Phase timing
+
+# name -> [total seconds, times entered], None while nobody is collecting
+_span_times: dict[str, list] | None = None
+_span_depth = 0
+_span_top_level = 0.0
+
+
+class Span:
+    # Times a phase of a solution, as `with span('name'):` or as a `@span('name')` decorator. Only does anything while
+    # the runner is collecting spans, otherwise it's an attribute check on enter and exit. Nested spans are counted in
+    # full under their own name and inside their parent.
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start: float | None = None
+
+    def __enter__(self) -> 'Span':
+        global _span_depth
+        if _span_times is not None:
+            _span_depth += 1
+            self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _span_depth, _span_top_level
+        if self.start is None or _span_times is None:
+            return
+        elapsed = perf_counter() - self.start
+        self.start = None
+        times = _span_times.get(self.name)
+        if times is None:
+            _span_times[self.name] = [elapsed, 1]
+        else:
+            times[0] += elapsed
+            times[1] += 1
+        _span_depth -= 1
+        if _span_depth == 0:
+            _span_top_level += elapsed
+
+    def __call__(self, func: Callable) -> Callable:
+        name = self.name
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _span_times is None:
+                return func(*args, **kwargs)
+            with Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def span(name: str) -> Span:
+    return Span(name)
+
+
+class SpanTimes:
+    def __init__(self):
+        self.times: dict[str, list] = {}
+        self.top_level = 0.0    # time spent in outermost spans, so inside at least one of them
+
+    def as_dict(self) -> dict[str, tuple[float, int]]:
+        return {name: (total, count) for name, (total, count) in self.times.items()}
+
+
+@contextmanager
+def collect_spans() -> Iterator[SpanTimes]:
+    # used by the runner around a single solve
+    global _span_times, _span_depth, _span_top_level
+    collected = SpanTimes()
+    _span_times, _span_depth, _span_top_level = collected.times, 0, 0.0
+    try:
+        yield collected
+    finally:
+        collected.top_level = _span_top_level
+        _span_times = None
+
+
 # 2D grids
 
 class Direction(Enum):
@@ -214,3 +391,248 @@ class LGrid(Grid[GT]):
         for i, row in enumerate(self.lines):  # type: int, list[GT]
             row.insert(x, column[i])
         self._width += 1
+
+
+# Hot-path counters
+
+# counter name -> count, None while nobody is counting
+_counts: Counter | None = None
+
+
+def _count_items(counts: Counter, name: str, iterable: Iterable) -> Iterator:
+    for item in iterable:
+        counts[name] += 1
+        yield item
+
+
+def _counted_call(counts: Counter, name: str, func: Callable) -> Callable:
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        counts[name] += 1
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def _counted_yield(counts: Counter, name: str, func: Callable) -> Callable:
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return _count_items(counts, name, func(*args, **kwargs))
+    return wrapper
+
+
+# (class, method, counter name, how to count it)
+_COUNTED_METHODS = (
+    (Vector, '__init__', 'Vector allocations', _counted_call),
+    (Vector, 'move_in', 'Vector.move_in', _counted_call),
+    (Grid, 'is_in_bounds', 'Grid.is_in_bounds', _counted_call),
+    (Grid, 'get_cell', 'Grid.get_cell', _counted_call),
+    (Grid, 'look_around', 'Grid.look_around', _counted_call),
+    (Grid, 'scan_all', 'Grid.scan_all cells', _counted_yield),
+    (Grid, 'scan_row', 'Grid.scan_row cells', _counted_yield),
+    (Grid, 'scan_column', 'Grid.scan_column cells', _counted_yield),
+)
+
+
+@contextmanager
+def count_calls() -> Iterator[Counter]:
+    # Used by the runner around a single solve. The counting wrappers only get patched into Vector and Grid for as long
+    # as this is active, the rest of the time the primitives run without any bookkeeping at all. Methods that
+    # subclasses override with their own aren't counted.
+    global _counts
+    counts = Counter()
+    originals = [(cls, method, vars(cls)[method]) for cls, method, _, _ in _COUNTED_METHODS]
+    for cls, method, name, counted in _COUNTED_METHODS:
+        setattr(cls, method, counted(counts, name, vars(cls)[method]))
+    _counts = counts
+    try:
+        yield counts
+    finally:
+        _counts = None
+        for cls, method, original in originals:
+            setattr(cls, method, original)
+
+
+# Array backends
+
+# Character grids that solutions want to treat as a whole (count, compare, slide things around) go through a backend.
+# 'python' works on lists of lists of str, 'numpy' on uint8 arrays of the character codes. Both take and return their
+# own array type, solutions shouldn't look inside it.
+BACKEND_ENV_VAR = 'AOC_BACKEND'
+BACKENDS = ('python', 'numpy')
+
+
+class PythonBackend:
+    name = 'python'
+
+    @staticmethod
+    def char_array(lines: Iterable[str]) -> list[list[str]]:
+        return [list(line) for line in lines]
+
+    @staticmethod
+    def to_lines(a: list[list[str]]) -> list[str]:
+        return [''.join(row) for row in a]
+
+    @staticmethod
+    def shape(a: list[list[str]]) -> tuple[int, int]:
+        return len(a), len(a[0]) if a else 0
+
+    @staticmethod
+    def copy(a: list[list[str]]) -> list[list[str]]:
+        return [list(row) for row in a]
+
+    @staticmethod
+    def transpose(a: list[list[str]]) -> list[list[str]]:
+        return [list(column) for column in zip(*a)]
+
+    @staticmethod
+    def count(a: list[list[str]], char: str) -> int:
+        return sum(row.count(char) for row in a)
+
+    @staticmethod
+    def row_counts(a: list[list[str]], char: str) -> list[int]:
+        return [row.count(char) for row in a]
+
+    @staticmethod
+    def mirror_mismatches(a: list[list[str]], i: int) -> int:
+        # cells that differ when the rows above i get mirrored onto the rows from i down
+        size = min(i, len(a) - i)
+        return sum(c1 != c2 for j in range(size) for c1, c2 in zip(a[i - 1 - j], a[i + j]))
+
+    @staticmethod
+    def roll(a: list[list[str]], direction: Direction, item: str, empty: str = '.') -> list[list[str]]:
+        # Slides every item cell as far as it goes in the cardinal direction, over empty cells. Anything else stops
+        # it. Rolls in place.
+        dx, dy = direction.value
+        height, width = len(a), len(a[0]) if a else 0
+        if dy != 0 and dx == 0:
+            ys = range(height) if dy < 0 else range(height - 1, -1, -1)
+            for x in range(width):
+                free = ys[0]    # where the next item would stop
+                for y in ys:
+                    c = a[y][x]
+                    if c == item:
+                        if free != y:
+                            a[free][x], a[y][x] = item, a[free][x]
+                        free -= dy
+                    elif c != empty:
+                        free = y - dy
+        elif dx != 0 and dy == 0:
+            xs = range(width) if dx < 0 else range(width - 1, -1, -1)
+            for row in a:
+                free = xs[0]
+                for x in xs:
+                    c = row[x]
+                    if c == item:
+                        if free != x:
+                            row[free], row[x] = item, row[free]
+                        free -= dx
+                    elif c != empty:
+                        free = x - dx
+        else:
+            raise ValueError(f'can only roll in a cardinal direction, not {direction.name}')
+        return a
+
+
+class NumpyBackend:
+    name = 'numpy'
+
+    def __init__(self):
+        # imported here, numpy is optional and takes longer to import than most solutions take to run
+        import numpy
+        self.np = numpy
+
+    def char_array(self, lines: Iterable[str]):
+        lines = list(lines)
+        data = ''.join(lines).encode('latin-1')
+        # the width is given, reshape can't infer it when there are no cells, and (0, 0) matches PythonBackend.shape
+        width = len(lines[0]) if lines else 0
+        return self.np.frombuffer(data, dtype=self.np.uint8).reshape(len(lines), width).copy()
+
+    @staticmethod
+    def to_lines(a) -> list[str]:
+        return [row.tobytes().decode('latin-1') for row in a]
+
+    @staticmethod
+    def shape(a) -> tuple[int, int]:
+        return a.shape
+
+    @staticmethod
+    def copy(a):
+        return a.copy()
+
+    @staticmethod
+    def transpose(a):
+        return a.T
+
+    def count(self, a, char: str) -> int:
+        return int(self.np.count_nonzero(a == ord(char)))
+
+    @staticmethod
+    def row_counts(a, char: str) -> list[int]:
+        return (a == ord(char)).sum(axis=1).tolist()
+
+    def mirror_mismatches(self, a, i: int) -> int:
+        size = min(i, a.shape[0] - i)
+        return int(self.np.count_nonzero(a[i - size:i][::-1] != a[i:i + size]))
+
+    def _roll_up(self, a, item: int, empty: int):
+        # Every wall starts a new segment of its column, a segment's items end up packed at its top
+        np = self.np
+        height, width = a.shape
+        walls = (a != item) & (a != empty)
+        rows = np.arange(height)[:, None]
+        segment_start = np.maximum.accumulate(np.where(walls, rows + 1, 0), axis=0)
+        segment_key = np.cumsum(walls, axis=0) * width + np.arange(width)
+        items_in_segment = np.bincount(segment_key[a == item], minlength=(height + 1) * width)[segment_key]
+        offset = rows - segment_start
+        rolled = np.where((offset >= 0) & (offset < items_in_segment), item, empty).astype(np.uint8)
+        return np.where(walls, a, rolled)
+
+    def roll(self, a, direction: Direction, item: str, empty: str = '.'):
+        # same as PythonBackend.roll, but returns a new array
+        item, empty = ord(item), ord(empty)
+        if direction == Direction.Up:
+            return self._roll_up(a, item, empty)
+        if direction == Direction.Down:
+            return self._roll_up(a[::-1], item, empty)[::-1]
+        if direction == Direction.Left:
+            return self._roll_up(a.T, item, empty).T
+        if direction == Direction.Right:
+            return self._roll_up(a.T[::-1], item, empty)[::-1].T
+        raise ValueError(f'can only roll in a cardinal direction, not {direction.name}')
+
+
+_backend: PythonBackend | NumpyBackend | None = None
+
+
+def set_backend(name: str) -> str:
+    # Returns the name of the backend actually in use, numpy falls back to python when it isn't installed
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f'unknown backend: {name}')
+    if name == 'numpy':
+        try:
+            _backend = NumpyBackend()
+        except ImportError:
+            print('Warning: numpy is not installed, using the python backend')
+            _backend = PythonBackend()
+    else:
+        _backend = PythonBackend()
+    return _backend.name
+
+
+def get_backend() -> PythonBackend | NumpyBackend:
+    if _backend is None:
+        set_backend(os.environ.get(BACKEND_ENV_VAR) or 'python')
+    return _backend
+
+
+def available_backends() -> list[str]:
+    names = ['python']
+    try:
+        import numpy    # noqa: F401
+    except ImportError:
+        pass
+    else:
+        names.append('numpy')
+    return names
@@ -0,0 +1,94 @@
+import gc
+from contextlib import contextmanager
+from time import perf_counter
+from typing import NamedTuple, Iterator, Callable
+
+GC_MODES = ('tuned', 'off')
+
+
+class GCStats(NamedTuple):
+    mode: str | None                    # None for the default collector, otherwise one of GC_MODES
+    collections: tuple[int, int, int]   # by generation
+    pause_time: float                   # seconds spent inside the collector
+    max_pause: float
+    collected: int                      # unreachable objects found
+
+    def as_dict(self) -> dict:
+        return {'mode': self.mode, 'collections': list(self.collections), 'pause_time': self.pause_time,
+                'max_pause': self.max_pause, 'collected': self.collected}
+
+
+class GCPauses:
+    def __init__(self):
+        self.collections = [0, 0, 0]
+        self.pause_time = 0.0
+        self.max_pause = 0.0
+        self.collected = 0
+        self._start: float | None = None
+
+    def callback(self, phase: str, info: dict):
+        if phase == 'start':
+            self._start = perf_counter()
+            return
+        if self._start is None:
+            return      # installed in the middle of a collection
+        pause = perf_counter() - self._start
+        self._start = None
+        self.collections[info['generation']] += 1
+        self.pause_time += pause
+        self.max_pause = max(self.max_pause, pause)
+        self.collected += info['collected']
+
+    def stats(self, mode: str | None = None) -> GCStats:
+        # noinspection PyTypeChecker
+        return GCStats(mode, tuple(self.collections), self.pause_time, self.max_pause, self.collected)
+
+
+@contextmanager
+def collect_gc_pauses() -> Iterator[GCPauses]:
+    # used by the runner around a single solve, garbage earlier solves left behind is collected before anything counts
+    gc.collect()
+    pauses = GCPauses()
+    gc.callbacks.append(pauses.callback)
+    try:
+        yield pauses
+    finally:
+        gc.callbacks.remove(pauses.callback)
+
+
+@contextmanager
+def tuned_gc(mode: str) -> Iterator[Callable[[], None]]:
+    # Moves everything alive at this point (the solution instance, every imported module, and for ParsedDay solutions
+    # the parsed input) into the permanent generation, so collections during the solve only have to traverse what the
+    # solve itself allocates. Solutions without a parse stage parse inside this, their input doesn't get frozen.
+    # 'tuned' also lets a hundred times more allocations pile up before a young collection, 'off' turns the collector
+    # off until the solve is done.
+    # The collection before freezing is setup, it's done before entering and shouldn't be timed. The yielded function
+    # restores the collector and collects whatever cyclic garbage piled up, that part is the cost of the mode and
+    # belongs inside the timing. It's called on the way out if the caller didn't.
+    if mode not in GC_MODES:
+        raise ValueError(f'unknown gc mode: {mode}')
+    thresholds, enabled = gc.get_threshold(), gc.isenabled()
+    gc.collect()
+    gc.freeze()
+    if mode == 'off':
+        gc.disable()
+    else:
+        gc.set_threshold(thresholds[0] * 100, *thresholds[1:])
+    restored = False
+
+    def restore():
+        nonlocal restored
+        if restored:
+            return
+        restored = True
+        # still frozen, so this only has to go through what was allocated since
+        gc.collect()
+        gc.unfreeze()
+        gc.set_threshold(*thresholds)
+        if enabled:
+            gc.enable()
+    try:
+        yield restore
+    finally:
+        restore()
@@ -0,0 +1,325 @@
+import hashlib
+import json
+import math
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple, Iterable, Literal
+
+import common
+from bench import format_ns
+from runner import dir_names, registry, input_path, parse_day_range, discover_days, PuzzleRunResult
+
+default_db_path = Path(dir_names['cache'], 'history.sqlite3')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,      -- unix time
+    kind TEXT NOT NULL,             -- 'bench', 'run' or 'run_all'
+    day INTEGER NOT NULL,
+    part INTEGER NOT NULL,
+    version TEXT,
+    git_commit TEXT,                -- NULL outside of a git checkout
+    common_hash TEXT NOT NULL,
+    module_hash TEXT NOT NULL,
+    input_hash TEXT,
+    python_version TEXT NOT NULL,
+    wall_time REAL NOT NULL,        -- seconds, the median for benchmarks
+    cpu_time REAL,
+    parse_time REAL,
+    samples TEXT                    -- JSON list of seconds, benchmarks only
+);
+CREATE INDEX IF NOT EXISTS results_series ON results (day, part, kind, recorded_at);
+'''
+
+
+class HistoryRecord(NamedTuple):
+    kind: str
+    day: int
+    part: int
+    version: str | None
+    wall_time: float
+    cpu_time: float | None = None
+    parse_time: float | None = None
+    samples: list[float] | None = None
+    input_file: str | None = None
+
+
+class Revision(NamedTuple):
+    # one state of the code a series was measured with, there can be several per commit with uncommitted changes
+    git_commit: str | None
+    common_hash: str
+    module_hash: str
+    first_recorded: float
+    samples: list[float]
+
+    @property
+    def label(self) -> str:
+        return f'{(self.git_commit or "-")[:8]} c:{self.common_hash[:6]} m:{self.module_hash[:6]}'
+
+
+_file_hashes: dict[str, str] = {}
+
+
+def file_hash(path: Path | str) -> str:
+    key = str(path)
+    if key not in _file_hashes:
+        _file_hashes[key] = hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+    return _file_hashes[key]
+
+
+def git_commit() -> str | None:
+    try:
+        proc = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent)
+    except OSError:
+        return None
+    return proc.stdout.strip() if proc.returncode == 0 else None
+
+
+def python_version() -> str:
+    return f'{sys.implementation.name} {sys.version.split()[0]}'
+
+
+def connect(db_path: Path = default_db_path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _module_path(day: int) -> Path:
+    return Path(dir_names['solutions'], f'{registry.get(day).module_name}.py')
+
+
+def record(records: Iterable[HistoryRecord], db_path: Path = default_db_path) -> int:
+    records = list(records)
+    if not records:
+        return 0
+    commit, common_hash, py_version = git_commit(), file_hash(common.__file__), python_version()
+    now = time.time()
+    rows = [(now, r.kind, r.day, r.part, r.version, commit, common_hash, file_hash(_module_path(r.day)),
+             None if r.input_file is None else file_hash(r.input_file), py_version, r.wall_time, r.cpu_time,
+             r.parse_time, None if r.samples is None else json.dumps(r.samples))
+            for r in records]
+    try:
+        with connect(db_path) as conn:
+            conn.executemany('INSERT INTO results (recorded_at, kind, day, part, version, git_commit, common_hash, '
+                             'module_hash, input_hash, python_version, wall_time, cpu_time, parse_time, samples) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+    except sqlite3.Error as e:
+        print(f'Error: could not record history in "{db_path}" ({e})')
+        return 0
+    return len(rows)
+
+
+def record_run_results(kind: Literal['run', 'run_all'], results: Iterable[PuzzleRunResult],
+                       db_path: Path = default_db_path) -> int:
+    # cached answers and failures don't say anything about speed
+    return record((HistoryRecord(kind, r.day, r.part, r.version, r.elapsed, r.cpu_elapsed, r.parse_elapsed,
+                                 input_file=r.input_file)
+                   for r in results if r.status == 'ok' and not r.cached), db_path)
+
+
+def record_bench_results(results: Iterable, version: str = None, db_path: Path = default_db_path) -> int:
+    # BenchResults of bench.bench_puzzle(), always measured on the default input
+    return record((HistoryRecord('bench', r.day, r.part, version, r.median / 1e9,
+                                 samples=[s / 1e9 for s in r.samples_ns], input_file=str(input_path(r.day)))
+                   for r in results), db_path)
+
+
+class Series(NamedTuple):
+    kind: str
+    day: int
+    part: int
+    version: str | None
+    input_hash: str | None
+    python_version: str           # a different interpreter starts a series of its own, it's not a slowdown
+    revisions: list[Revision]     # oldest first
+
+    @property
+    def title(self) -> str:
+        version = '' if self.version is None else f' ({self.version})'
+        input_hash = '' if self.input_hash is None else f', input {self.input_hash[:8]}'
+        return f'day {self.day} part {self.part}{version}: {self.kind}{input_hash}, {self.python_version}'
+
+
+def load_series(conn: sqlite3.Connection, days: list[int] = None, parts: Iterable[int] = (1, 2), kind: str = None,
+                version: str = None) -> list[Series]:
+    params: list = list(parts)
+    query = ('SELECT kind, day, part, version, input_hash, python_version, git_commit, common_hash, module_hash, '
+             f'recorded_at, wall_time, samples FROM results WHERE part IN ({", ".join("?" * len(params))})')
+    if days is not None:
+        query += f' AND day IN ({", ".join("?" * len(days))})'
+        params.extend(days)
+    if kind is not None:
+        query += ' AND kind = ?'
+        params.append(kind)
+    if version is not None:
+        query += ' AND version = ?'
+        params.append(version)
+    query += ' ORDER BY recorded_at, id'
+    series: dict[tuple, dict[tuple, Revision]] = {}
+    for kind_, day, part, version_, input_hash, py_version, commit, common_hash, module_hash, recorded_at, wall_time, \
+            samples in conn.execute(query, params):
+        revisions = series.setdefault((kind_, day, part, version_, input_hash, py_version), {})
+        rev_key = (commit, common_hash, module_hash)
+        if rev_key not in revisions:
+            revisions[rev_key] = Revision(commit, common_hash, module_hash, recorded_at, [])
+        revisions[rev_key].samples.extend([wall_time] if samples is None else json.loads(samples))
+    return [Series(*key, sorted(revisions.values(), key=lambda r: r.first_recorded))
+            for key, revisions in sorted(series.items(),
+                                         key=lambda s: (s[0][1], s[0][2], s[0][0], s[0][3] or '', s[0][5]))]
+
+
+def slower_p_value(before: list[float], after: list[float]) -> float:
+    # One-sided Mann-Whitney U test, normal approximation with tie and continuity correction. Probability of `after`
+    # ranking at least this far above `before` if both were drawn from the same distribution. Makes no assumption
+    # about the shape of the distribution, timings have a long tail on the slow side.
+    n1, n2 = len(before), len(after)
+    n = n1 + n2
+    values = sorted([(v, 0) for v in before] + [(v, 1) for v in after])
+    rank_sum, tie_term = 0.0, 0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and values[j + 1][0] == values[i][0]:
+            j += 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        avg_rank = (i + j) / 2 + 1
+        rank_sum += avg_rank * sum(1 for k in range(i, j + 1) if values[k][1] == 1)
+        i = j + 1
+    u = rank_sum - n2 * (n2 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 1 - statistics.NormalDist().cdf(z)
+
+
+class Slowdown(NamedTuple):
+    series: Series
+    before: Revision
+    after: Revision
+    ratio: float        # of the medians
+    p_value: float
+
+    def describe(self) -> str:
+        return (f'{self.series.title}: {format_ns(statistics.median(self.after.samples) * 1e9)} at {self.after.label} '
+                f'vs {format_ns(statistics.median(self.before.samples) * 1e9)} at {self.before.label} '
+                f'(+{(self.ratio - 1) * 100:.1f}%, p={self.p_value:.3g})')
+
+
+def compare_revisions(series: Series, before: Revision, after: Revision, alpha: float = 0.01,
+                      threshold: float = 0.05, min_samples: int = 3) -> Slowdown | None:
+    # Needs both a significant difference and one that's big enough to care about, with enough samples a 0.5%
+    # slowdown is significant too
+    if len(before.samples) < min_samples or len(after.samples) < min_samples:
+        return None
+    ratio = statistics.median(after.samples) / statistics.median(before.samples)
+    if ratio <= 1 + threshold:
+        return None
+    p_value = slower_p_value(before.samples, after.samples)
+    return Slowdown(series, before, after, ratio, p_value) if p_value < alpha else None
+
+
+def find_slowdowns(series_list: Iterable[Series], alpha: float = 0.01, threshold: float = 0.05) -> list[Slowdown]:
+    # latest revision of every series against the one before it
+    slowdowns = []
+    for series in series_list:
+        if len(series.revisions) >= 2:
+            slowdown = compare_revisions(series, series.revisions[-2], series.revisions[-1], alpha, threshold)
+            if slowdown is not None:
+                slowdowns.append(slowdown)
+    return slowdowns
+
+
+def report_slowdowns(days: list[int], parts: Iterable[int], kind: str, db_path: Path = default_db_path):
+    # printed by commands right after they recorded new results
+    try:
+        with connect(db_path) as conn:
+            slowdowns = find_slowdowns(load_series(conn, days=days, parts=parts, kind=kind))
+    except sqlite3.Error as e:
+        print(f'Error: could not read history from "{db_path}" ({e})')
+        return
+    if slowdowns:
+        print('Slower than the previous revision:')
+        for s in slowdowns:
+            print(f'  {s.describe()}')
+
+
+def print_trend(series: Series, last: int = 10, alpha: float = 0.01, threshold: float = 0.05):
+    print(series.title)
+    print(f'  {"revision":<26} {"date":<16} {"n":>4} {"median":>11} {"min":>11} {"change":>8}')
+    revisions = series.revisions
+    start = max(len(revisions) - last, 0)
+    for i in range(start, len(revisions)):
+        rev = revisions[i]
+        median = statistics.median(rev.samples)
+        change, flag = '', ''
+        if i > 0:
+            change = f'{(median / statistics.median(revisions[i - 1].samples) - 1) * 100:+.1f}%'
+            if compare_revisions(series, revisions[i - 1], rev, alpha, threshold) is not None:
+                flag = ' slower'
+        date = time.strftime('%Y-%m-%d %H:%M', time.localtime(rev.first_recorded))
+        print(f'  {rev.label:<26} {date:<16} {len(rev.samples):>4} {format_ns(median * 1e9):>11} '
+              f'{format_ns(min(rev.samples) * 1e9):>11} {change:>8}{flag}')
+
+
+def history(args: list[str]) -> bool:
+    days: list[int] | None = None
+    parts: tuple[Literal[1, 2], ...] = (1, 2)
+    kind: str | None = None
+    version: str | None = None
+    db_path = default_db_path
+    last, alpha, threshold = 10, 0.01, 0.05
+    check = False
+    args_iter = iter(args)
+    for arg in args_iter:
+        if arg == '--version':
+            version = next(args_iter)
+            continue
+        arg = arg.lower()
+        if arg == '--kind':
+            kind = next(args_iter)
+        elif arg == '--db':
+            db_path = Path(next(args_iter))
+        elif arg == '-n':
+            last = int(next(args_iter))
+        elif arg == '--alpha':
+            alpha = float(next(args_iter))
+        elif arg == '--threshold':
+            threshold = float(next(args_iter))
+        elif arg == '--check':
+            check = True
+        elif arg.startswith('d') or arg == 'all':
+            days = parse_day_range(arg, discover_days())
+        elif arg.startswith('p'):
+            # noinspection PyTypeChecker
+            parts = (int(arg[1:]),)
+    if not db_path.is_file():
+        print(f'Error: no history at "{db_path}" yet, it is recorded by the bench and compare commands and by '
+              f'run --history')
+        return False
+    with connect(db_path) as conn:
+        series_list = load_series(conn, days=days, parts=parts, kind=kind, version=version)
+    if not series_list:
+        print('No recorded results match')
+        return True
+    if check:
+        slowdowns = find_slowdowns(series_list, alpha, threshold)
+        if slowdowns:
+            print(f'Slowdowns over {threshold * 100:.0f}% since the previous revision (p < {alpha:g}):')
+            for s in slowdowns:
+                print(f'  {s.describe()}')
+            return False
+        print(f'No slowdowns over {threshold * 100:.0f}% since the previous revision in {len(series_list)} series')
+        return True
+    for series in series_list:
+        print_trend(series, last=last, alpha=alpha, threshold=threshold)
+    return True
@@ -0,0 +1,84 @@
+import os
+import signal
+import sys
+import time
+from typing import Callable, NamedTuple, Any
+
+
+class IsolatedResult(NamedTuple):
+    status: str         # 'ok', 'error', 'timeout', 'memory' or 'crashed'
+    value: Any          # return value of the call, or an error message
+    elapsed: float      # time spent in the call as measured by the child, or the wall time until it got killed
+
+
+def peak_rss_bytes() -> int | None:
+    # high-water mark of the whole process, not just of the current solve
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macOS reports bytes
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _limit_memory(max_mem: int):
+    import resource
+    # address space rather than RSS, it's the only limit linux actually enforces
+    resource.setrlimit(resource.RLIMIT_AS, (max_mem, max_mem))
+
+
+def _child_main(conn, func: Callable[[], Any], max_mem: int | None):
+    if max_mem is not None:
+        _limit_memory(max_mem)
+    start_time = time.time()
+    try:
+        result = IsolatedResult('ok', func(), 0.0)
+    except MemoryError:
+        result = IsolatedResult('memory', 'memory limit exceeded', 0.0)
+    except BaseException as e:
+        result = IsolatedResult('error', f'{type(e).__name__}: {e}', 0.0)
+    result = result._replace(elapsed=time.time() - start_time)
+    try:
+        conn.send(result)
+    except MemoryError:
+        conn.send(IsolatedResult('memory', 'memory limit exceeded', result.elapsed))
+    except Exception as e:
+        # unpicklable return value
+        conn.send(IsolatedResult('error', f'{type(e).__name__}: {e}', result.elapsed))
+    conn.close()
+
+
+def run_isolated(func: Callable[[], Any], timeout: float = None, max_mem: int = None) -> IsolatedResult:
+    # Calls func() in a forked child process, so it can be killed once it goes over `timeout` seconds and can't take
+    # the runner down with it when it goes over `max_mem` bytes. Forking means func can be any closure, it does not
+    # have to be picklable, only its return value does.
+    import multiprocessing
+    ctx = multiprocessing.get_context('fork')
+    recv_conn, send_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_child_main, args=(send_conn, func, max_mem))
+    start_time = time.time()
+    proc.start()
+    send_conn.close()
+    try:
+        if not recv_conn.poll(timeout):
+            return IsolatedResult('timeout', f'timed out after {timeout:g}s', time.time() - start_time)
+        try:
+            return recv_conn.recv()
+        except EOFError:
+            pass    # died without sending anything back
+        proc.join()
+        elapsed = time.time() - start_time
+        if max_mem is not None and proc.exitcode == -signal.SIGKILL:
+            # the kernel OOM killer, or an allocation outside of python that ran into the rlimit
+            return IsolatedResult('memory', 'killed, likely over the memory limit', elapsed)
+        return IsolatedResult('crashed', f'child process exited with code {proc.exitcode}', elapsed)
+    finally:
+        recv_conn.close()
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+
+
+def isolation_supported() -> bool:
+    return hasattr(os, 'fork')
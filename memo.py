@@ -0,0 +1,147 @@
+import gc
+import sys
+from contextlib import contextmanager
+from functools import cached_property
+from types import ModuleType
+from typing import NamedTuple, Callable, Any, Iterator
+
+
+class MemoCache(NamedTuple):
+    name: str                       # module:qualname, like "day12:Day12.count_arrangements"
+    func: Callable | None           # the functools.cache / lru_cache wrapper
+    owner: type | None = None       # class holding a cached_property
+    attr_name: str | None = None    # name of the cached_property
+
+    @property
+    def is_property(self) -> bool:
+        return self.func is None
+
+
+class MemoCacheStats(NamedTuple):
+    name: str
+    hits: int | None            # unknown for cached_property
+    misses: int | None
+    entries: int                # for cached_property, values computed during the solve
+    size: int                   # approximate, shallow sizes of the stored keys and values
+
+    @property
+    def hit_rate(self) -> float | None:
+        if self.hits is None or self.hits + self.misses == 0:
+            return None
+        return self.hits / (self.hits + self.misses)
+
+    def as_dict(self) -> dict:
+        return {'name': self.name, 'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate,
+                'entries': self.entries, 'size': self.size}
+
+
+def _is_memo_wrapper(obj: Any) -> bool:
+    return callable(obj) and hasattr(obj, 'cache_info') and hasattr(obj, 'cache_clear')
+
+
+def _scan_module(module: ModuleType) -> list[MemoCache]:
+    module_name = module.__name__.rpartition('.')[2]
+    caches = []
+    for value in vars(module).values():
+        if getattr(value, '__module__', None) != module.__name__:
+            continue    # imported from somewhere else
+        if _is_memo_wrapper(value):
+            caches.append(MemoCache(f'{module_name}:{value.__qualname__}', value))
+        elif isinstance(value, type):
+            for attr_name, attr in vars(value).items():
+                if isinstance(attr, cached_property):
+                    caches.append(MemoCache(f'{module_name}:{value.__qualname__}.{attr_name}', None, value, attr_name))
+                    continue
+                if isinstance(attr, (classmethod, staticmethod)):
+                    attr = attr.__func__
+                elif isinstance(attr, property):
+                    attr = attr.fget
+                if _is_memo_wrapper(attr):
+                    caches.append(MemoCache(f'{module_name}:{value.__qualname__}.{attr_name}', attr))
+    return caches
+
+
+_module_caches: dict[str, list[MemoCache]] = {}
+
+
+def find_memo_caches(cls: type) -> list[MemoCache]:
+    # Memoized functions, methods and cached properties defined in the modules of cls and its bases. functools caches
+    # on methods are shared by all instances and keep every `self` they've seen alive until they're cleared.
+    caches = []
+    for klass in cls.__mro__:
+        module = sys.modules.get(klass.__module__)
+        if module is None or module.__name__ == 'builtins':
+            continue
+        if module.__name__ not in _module_caches:
+            _module_caches[module.__name__] = _scan_module(module)
+        caches.extend(c for c in _module_caches[module.__name__] if c not in caches)
+    return caches
+
+
+def _wrapper_cache_dict(func: Callable) -> dict | None:
+    # CPython's lru_cache wrapper doesn't expose its dict, but reports it to the garbage collector
+    func_dict = getattr(func, '__dict__', None)
+    size = func.cache_info().currsize
+    for referent in gc.get_referents(func):
+        if isinstance(referent, dict) and referent is not func_dict and len(referent) == size:
+            return referent
+    return None
+
+
+class PropertyValues:
+    # Values cached properties computed during a solve, by cache name. Their instances are usually gone by the time the
+    # solve returns, so they're counted as they get computed.
+    def __init__(self):
+        self.entries: dict[str, int] = {}
+        self.size: dict[str, int] = {}
+
+    def add(self, name: str, value: Any):
+        self.entries[name] = self.entries.get(name, 0) + 1
+        self.size[name] = self.size.get(name, 0) + sys.getsizeof(value)
+
+
+@contextmanager
+def record_cached_properties(caches: list[MemoCache]) -> Iterator[PropertyValues]:
+    # swaps the function of every cached property for one that also records what it returns, for a single solve
+    values = PropertyValues()
+    originals = []
+    for c in caches:
+        if not c.is_property:
+            continue
+        prop: cached_property = vars(c.owner)[c.attr_name]
+
+        def recording(instance, func=prop.func, name=c.name):
+            value = func(instance)
+            values.add(name, value)
+            return value
+        originals.append((prop, prop.func))
+        prop.func = recording
+    try:
+        yield values
+    finally:
+        for prop, func in originals:
+            prop.func = func
+
+
+def memo_cache_stats(caches: list[MemoCache], property_values: PropertyValues = None) -> list[MemoCacheStats]:
+    # cached properties only have stats if their values were recorded with record_cached_properties()
+    stats = []
+    for c in caches:
+        if c.is_property:
+            if property_values is not None:
+                stats.append(MemoCacheStats(c.name, None, None, property_values.entries.get(c.name, 0),
+                                            property_values.size.get(c.name, 0)))
+            continue
+        info = c.func.cache_info()
+        cache_dict = _wrapper_cache_dict(c.func)
+        size = 0 if cache_dict is None else sys.getsizeof(cache_dict) + sum(
+            sys.getsizeof(k) + sys.getsizeof(v) for k, v in cache_dict.items())
+        stats.append(MemoCacheStats(c.name, info.hits, info.misses, info.currsize, size))
+    return stats
+
+
+def clear_memo_caches(caches: list[MemoCache]):
+    # cached properties go away with their instances, only the functools caches outlive a solve
+    for c in caches:
+        if not c.is_property:
+            c.func.cache_clear()
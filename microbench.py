@@ -0,0 +1,254 @@
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from bench import format_ns
+from common import Vector, Direction, DIRECTIONS_ALL, Grid, LGrid, line_iterator, batch_iterator
+from runner import dir_names
+
+default_baseline_path = Path(dir_names['cache'], 'microbench.json')
+
+GRID_SIZE = 100
+
+
+class MicroCase(NamedTuple):
+    name: str
+    ops: int                                    # operations done by one call of the timed function
+    setup: Callable[[], Callable[[], object]]   # untimed, builds fresh state and returns the timed function
+
+
+class MicroResult(NamedTuple):
+    name: str
+    ops: int
+    samples_ns: list[int]   # per call of the timed function, so for `ops` operations
+
+    @property
+    def min(self) -> float:
+        return min(self.samples_ns) / self.ops
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples_ns) / self.ops
+
+    def as_dict(self) -> dict:
+        return {'name': self.name, 'ops': self.ops, 'min_ns': self.min, 'median_ns': self.median,
+                'samples_ns': self.samples_ns}
+
+
+def _vectors() -> list[Vector]:
+    return [Vector(x, y) for y in range(GRID_SIZE) for x in range(GRID_SIZE)]
+
+
+def _grid(grid_type: type[Grid] = Grid) -> Grid[str]:
+    grid = grid_type()
+    for y in range(GRID_SIZE):
+        grid.add_line([('#' if (x * y) % 7 == 0 else '.') for x in range(GRID_SIZE)])
+    return grid
+
+
+def _vector_add():
+    vectors, offset = _vectors(), Vector(1, -1)
+    return lambda: [v + offset for v in vectors]
+
+
+def _vector_sub():
+    vectors, offset = _vectors(), Vector(1, -1)
+    return lambda: [v - offset for v in vectors]
+
+
+def _vector_mul():
+    vectors = _vectors()
+    return lambda: [v * 3 for v in vectors]
+
+
+def _vector_move_in():
+    vectors = _vectors()
+    return lambda: [v.move_in(Direction.Right) for v in vectors]
+
+
+def _vector_add_direction():
+    vectors = _vectors()
+    return lambda: [v + Direction.DownLeft for v in vectors]
+
+
+def _vector_hash():
+    vectors = _vectors()
+    return lambda: [hash(v) for v in vectors]
+
+
+def _vector_set_lookup():
+    vectors = _vectors()
+    seen = set(vectors[::2])
+    return lambda: [v in seen for v in vectors]
+
+
+def _direction_inverse():
+    directions = DIRECTIONS_ALL * 1000
+    return lambda: [d.inverse for d in directions]
+
+
+def _grid_get_cell():
+    grid, vectors = _grid(), _vectors()
+    return lambda: [grid.get_cell(v) for v in vectors]
+
+
+def _grid_is_in_bounds():
+    grid, vectors = _grid(), _vectors()
+    return lambda: [grid.is_in_bounds(v) for v in vectors]
+
+
+def _grid_look_around():
+    grid = _grid()
+    center = [Vector(x, y) for y in range(1, GRID_SIZE - 1, 3) for x in range(1, GRID_SIZE - 1, 3)]
+    return lambda: [list(grid.look_around(v)) for v in center]
+
+
+def _grid_scan_all():
+    grid = _grid()
+    return lambda: list(grid.scan_all())
+
+
+def _grid_scan_row():
+    grid = _grid()
+    return lambda: [list(grid.scan_row(y)) for y in range(grid.height)]
+
+
+def _grid_scan_column():
+    grid = _grid()
+    return lambda: [list(grid.scan_column(x)) for x in range(grid.width)]
+
+
+def _lgrid_insert_column():
+    # inserting changes the grid, every sample gets a new one
+    grid = _grid(LGrid)
+    column = ['.'] * GRID_SIZE
+    return lambda: [grid.insert_column(GRID_SIZE // 2, column) for _ in range(GRID_SIZE)]
+
+
+_lines = '\n'.join('.#' * 20 + str(i) for i in range(10000)) + '\n'
+_lines_bytes = _lines.encode('utf8')
+
+
+def _line_iterator_str():
+    return lambda: list(line_iterator(_lines))
+
+
+def _line_iterator_bytes():
+    return lambda: list(line_iterator(_lines_bytes))
+
+
+def _batch_iterator():
+    items = list(range(30000))
+    return lambda: list(batch_iterator(items, 3))
+
+
+CASES = (
+    MicroCase('vector_add', GRID_SIZE ** 2, _vector_add),
+    MicroCase('vector_sub', GRID_SIZE ** 2, _vector_sub),
+    MicroCase('vector_mul', GRID_SIZE ** 2, _vector_mul),
+    MicroCase('vector_move_in', GRID_SIZE ** 2, _vector_move_in),
+    MicroCase('vector_add_direction', GRID_SIZE ** 2, _vector_add_direction),
+    MicroCase('vector_hash', GRID_SIZE ** 2, _vector_hash),
+    MicroCase('vector_set_lookup', GRID_SIZE ** 2, _vector_set_lookup),
+    MicroCase('direction_inverse', len(DIRECTIONS_ALL) * 1000, _direction_inverse),
+    MicroCase('grid_get_cell', GRID_SIZE ** 2, _grid_get_cell),
+    MicroCase('grid_is_in_bounds', GRID_SIZE ** 2, _grid_is_in_bounds),
+    MicroCase('grid_look_around', len(range(1, GRID_SIZE - 1, 3)) ** 2, _grid_look_around),
+    MicroCase('grid_scan_all', GRID_SIZE ** 2, _grid_scan_all),
+    MicroCase('grid_scan_row', GRID_SIZE ** 2, _grid_scan_row),
+    MicroCase('grid_scan_column', GRID_SIZE ** 2, _grid_scan_column),
+    MicroCase('lgrid_insert_column', GRID_SIZE, _lgrid_insert_column),
+    MicroCase('line_iterator_str', 10000, _line_iterator_str),
+    MicroCase('line_iterator_bytes', 10000, _line_iterator_bytes),
+    MicroCase('batch_iterator', 10000, _batch_iterator),
+)
+
+
+def run_case(case: MicroCase, warmup: int = 2, repeats: int = 20) -> MicroResult:
+    samples = []
+    for i in range(warmup + repeats):
+        func = case.setup()
+        start_time = time.perf_counter_ns()
+        func()
+        elapsed = time.perf_counter_ns() - start_time
+        if i >= warmup:
+            samples.append(elapsed)
+    return MicroResult(case.name, case.ops, samples)
+
+
+def load_baseline(path: Path) -> dict[str, dict]:
+    if not path.is_file():
+        return {}
+    with path.open(mode='rt', encoding='utf8') as f:
+        return json.load(f)
+
+
+def save_baseline(results: list[MicroResult], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open(mode='wt', encoding='utf8', newline='\n') as f:
+        json.dump({r.name: r.as_dict() for r in results}, f, indent=2)
+
+
+def microbench(args: list[str]) -> bool:
+    warmup, repeats, threshold = 2, 20, 0.1
+    baseline_path = default_baseline_path
+    update_baseline = False
+    name_filters = []
+    args_iter = iter(args)
+    for arg in args_iter:
+        if arg == '-w':
+            warmup = int(next(args_iter))
+        elif arg == '-n':
+            repeats = int(next(args_iter))
+        elif arg == '--baseline':
+            baseline_path = Path(next(args_iter))
+        elif arg == '--save-baseline':
+            update_baseline = True
+        elif arg == '--threshold':
+            threshold = float(next(args_iter))
+        else:
+            name_filters.append(arg.lower())
+    if repeats < 1:
+        print('Error: need at least 1 repetition')
+        return False
+    cases = [c for c in CASES if not name_filters or any(f in c.name for f in name_filters)]
+    if not cases:
+        print(f'Error: no microbenchmark matches {", ".join(name_filters)}')
+        return False
+
+    baseline = load_baseline(baseline_path)
+    results = []
+    regressions = []
+    # compared on the per-operation minimum, the median of such short runs moves around too much with everything else
+    # that happens on the machine
+    print(f'{"case":<22} {"min/op":>9} {"median/op":>9} {"baseline":>9} {"change":>8}')
+    for case in cases:
+        r = run_case(case, warmup=warmup, repeats=repeats)
+        results.append(r)
+        base = baseline.get(r.name)
+        if base is None:
+            print(f'{r.name:<22} {format_ns(r.min):>9} {format_ns(r.median):>9}')
+            continue
+        change = r.min / base['min_ns'] - 1
+        print(f'{r.name:<22} {format_ns(r.min):>9} {format_ns(r.median):>9} {format_ns(base["min_ns"]):>9} '
+              f'{change * 100:>+7.1f}%')
+        if change > threshold:
+            regressions.append(f'{r.name}: {format_ns(r.min)} vs baseline {format_ns(base["min_ns"])} per op '
+                               f'(+{change * 100:.1f}%)')
+
+    if update_baseline:
+        # cases that weren't run this time keep their old numbers
+        run_names = {r.name for r in results}
+        kept = [MicroResult(name, b['ops'], b['samples_ns']) for name, b in baseline.items() if name not in run_names]
+        save_baseline(kept + results, baseline_path)
+        print(f'Saved baseline to "{baseline_path}"')
+    elif not baseline:
+        print(f'No baseline at "{baseline_path}" yet, save one with --save-baseline')
+    if regressions:
+        print(f'Regressions over {threshold * 100:.0f}% threshold:')
+        for line in regressions:
+            print(f'  {line}')
+        return False
+    return True
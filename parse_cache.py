@@ -0,0 +1,61 @@
+import hashlib
+import marshal
+import struct
+import sys
+from pathlib import Path
+from typing import Iterable
+
+from answer_cache import hash_files
+
+CACHE_FORMAT_VERSION = 1
+MARSHAL_VERSION = 4
+
+# file header: magic, cache format version, marshal version, payload length
+_HEADER = struct.Struct('<4sBBQ')
+_MAGIC = b'AOCP'
+
+
+# On-disk store of parsed inputs, for ParsedDay solutions that set PARSED_FORMAT. Entries hold whatever the solution's
+# dump_parsed() returned, marshalled: plain ints, strs, bytes (packed arrays), tuples, lists and dicts, never pickled
+# objects, so a stale or foreign entry can't run any code on load.
+class ParseCache:
+    def __init__(self, root: Path):
+        self.root = root
+
+    @staticmethod
+    def make_key(day: int, class_name: str, input_bytes: bytes, source_paths: Iterable[Path],
+                 parsed_format: int) -> str:
+        h = hashlib.sha256()
+        # marshal's format may change between python versions
+        h.update(f'{CACHE_FORMAT_VERSION}|{sys.version_info[0]}.{sys.version_info[1]}|{day}|{class_name}|'
+                 f'{parsed_format}|'.encode('utf8'))
+        h.update(hashlib.sha256(input_bytes).digest())
+        h.update(hash_files(source_paths).encode('ascii'))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f'{key}.bin'
+
+    def get(self, key: str) -> object | None:
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        data = path.read_bytes()
+        try:
+            magic, cache_version, marshal_version, length = _HEADER.unpack_from(data)
+            if magic != _MAGIC or cache_version != CACHE_FORMAT_VERSION or len(data) != _HEADER.size + length:
+                return None
+            return marshal.loads(memoryview(data)[_HEADER.size:])
+        except (struct.error, ValueError, EOFError, TypeError):
+            # corrupted or truncated entry, treat it as a miss and let it get overwritten
+            return None
+
+    def put(self, key: str, parsed_data: object):
+        payload = marshal.dumps(parsed_data, MARSHAL_VERSION)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with tmp_path.open(mode='wb') as f:
+            f.write(_HEADER.pack(_MAGIC, CACHE_FORMAT_VERSION, MARSHAL_VERSION, len(payload)))
+            f.write(payload)
+        tmp_path.replace(path)
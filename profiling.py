@@ -0,0 +1,182 @@
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Callable, TypeVar
+
+from isolation import peak_rss_bytes
+
+
+RT = TypeVar('RT')
+
+
+def profile_call(func: Callable[..., RT], dump_path: Path, top_n: int = 20, **kwargs) -> RT:
+    # imported here, pstats alone takes longer to import than everything the sampling profiler needs
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    try:
+        result = profiler.runcall(func, **kwargs)
+    finally:
+        dump_path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(dump_path)
+    stats = pstats.Stats(profiler)
+    stats.strip_dirs()
+    print(f'Profile saved to "{dump_path}"')
+    print(f'----- top {top_n} by cumulative time -----')
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top_n)
+    print(f'----- top {top_n} by self time -----')
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(top_n)
+    return result
+
+
+# Sampling
+
+class StackSampler(threading.Thread):
+    # Grabs the stack of one thread from sys._current_frames() every `interval` seconds. Stacks are counted as tuples of
+    # code objects, leaf first, and only get turned into names once sampling is done. Frames from stop_frame upwards
+    # (the caller of the profiled function) are left out.
+    def __init__(self, thread_id: int, stop_frame: FrameType, interval: float = 0.005):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.stop_frame = stop_frame
+        self.interval = interval
+        self.counts: Counter[tuple[CodeType, ...]] = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        # locals, this loop competes with the profiled thread for the GIL
+        current_frames, counts = sys._current_frames, self.counts
+        thread_id, stop_frame = self.thread_id, self.stop_frame
+        while not self._stop_event.wait(self.interval):
+            frame = current_frames().get(thread_id)
+            stack = []
+            while frame is not None and frame is not stop_frame:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                counts[tuple(stack)] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def code_name(code: CodeType) -> str:
+    return f'{Path(code.co_filename).stem}:{getattr(code, "co_qualname", code.co_name)}'
+
+
+def collapse_stacks(counts: Counter[tuple[CodeType, ...]]) -> Counter[str]:
+    # "root;caller;leaf" -> samples, the input format of flamegraph.pl, speedscope and friends
+    names: dict[CodeType, str] = {}
+    collapsed = Counter()
+    for stack, count in counts.items():
+        for code in stack:
+            if code not in names:
+                names[code] = code_name(code)
+        collapsed[';'.join(names[code] for code in reversed(stack))] += count
+    return collapsed
+
+
+def sample_call(func: Callable[..., RT], dump_path: Path, interval: float = 0.005, top_n: int = 20,
+                quiet: bool = False, **kwargs) -> RT:
+    sampler = StackSampler(threading.get_ident(), sys._getframe(), interval=interval)
+    start_time = time.perf_counter()
+    sampler.start()
+    try:
+        result = func(**kwargs)
+    finally:
+        sampler.stop()
+        elapsed_time = time.perf_counter() - start_time
+        collapsed = collapse_stacks(sampler.counts)
+        dump_path.parent.mkdir(parents=True, exist_ok=True)
+        with dump_path.open(mode='wt', encoding='utf8', newline='\n') as f:
+            for stack, count in collapsed.most_common():
+                f.write(f'{stack} {count}\n')
+    if quiet:
+        return result
+    total = sampler.counts.total()
+    print(f'Collapsed stacks saved to "{dump_path}"')
+    if total == 0:
+        print('No samples taken, the call was shorter than the sampling interval')
+        return result
+    # the sampler has to wait for the GIL, so it usually ends up sampling less often than asked
+    print(f'{total} samples, one every {elapsed_time / total * 1000:.1f}ms (asked for {interval * 1000:g}ms)')
+    self_counts, total_counts = Counter(), Counter()
+    for stack, count in sampler.counts.items():
+        self_counts[stack[0]] += count
+        for code in set(stack):
+            total_counts[code] += count
+    for title, counts in (('self', self_counts), ('total', total_counts)):
+        print(f'----- top {top_n} by {title} samples -----')
+        for code, count in counts.most_common(top_n):
+            print(f'{count / total * 100:>6.1f}% {count:>7}  {code_name(code)}')
+    return result
+
+
+# Memory
+
+class PeakSnapshotter(threading.Thread):
+    # Polls traced memory from a background thread and re-takes a snapshot every time usage grows past the size of the
+    # previous snapshot by `growth`, so the last snapshot approximates what was alive around the peak
+    def __init__(self, interval: float = 0.05, growth: float = 1.25):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.growth = growth
+        self.snapshot: tracemalloc.Snapshot | None = None
+        self.snapshot_size = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            current, _ = tracemalloc.get_traced_memory()
+            if current > max(self.snapshot_size * self.growth, 1 << 20):
+                self.snapshot = tracemalloc.take_snapshot()
+                self.snapshot_size = current
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f'{size:.1f}{unit}'
+        size /= 1024
+    return f'{size:.1f}GiB'
+
+
+def trace_memory_call(func: Callable[..., RT], top_n: int = 10, **kwargs) -> tuple[RT, int]:
+    # returns the result of the call and the peak of traced memory during it, in bytes
+    tracemalloc.start()
+    snapshotter = PeakSnapshotter()
+    snapshotter.start()
+    try:
+        result = func(**kwargs)
+    finally:
+        snapshotter.stop()
+        _, peak = tracemalloc.get_traced_memory()
+        if snapshotter.snapshot is None:
+            snapshot, snapshot_kind = tracemalloc.take_snapshot(), 'still alive after the solve'
+        else:
+            snapshot = snapshotter.snapshot
+            snapshot_kind = f'alive near peak ({format_bytes(snapshotter.snapshot_size)})'
+        tracemalloc.stop()
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, threading.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+    rss = peak_rss_bytes()
+    print(f'Peak traced memory: {format_bytes(peak)}, '
+          f'peak RSS of the process so far: {"n/a" if rss is None else format_bytes(rss)}')
+    print(f'----- top {top_n} allocation sites, {snapshot_kind} -----')
+    for stat in snapshot.statistics('lineno')[:top_n]:
+        frame = stat.traceback[0]
+        print(f'{format_bytes(stat.size):>10} {stat.count:>9} blocks  {frame.filename}:{frame.lineno}')
+    return result, peak
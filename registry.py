@@ -0,0 +1,79 @@
+import re
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+
+# matches `class Day12(` and `class Day12V_fast(`, but not helper classes like `class Day19Part(`
+solution_class_regex = re.compile(r'^class (Day(\d+)(?:V_(\w+))?)\(', re.MULTILINE)
+module_name_regex = re.compile(r'day(\d+)')
+generator_regex = re.compile(r'^def generate_input\(', re.MULTILINE)
+
+
+class SolutionEntry(NamedTuple):
+    day: int
+    module_name: str
+    path: Path
+    versions: tuple[str | None, ...]    # None is the unversioned `DayN` class
+    has_generator: bool                 # module defines generate_input(size, rng)
+
+    @property
+    def class_names(self) -> list[str]:
+        return [f'Day{self.day}' if v is None else f'Day{self.day}V_{v}' for v in self.versions]
+
+
+class SolutionRegistry:
+    # Indexes solution modules by scanning their source text, nothing gets imported until a solution is actually run
+    def __init__(self, solutions_dir: Path):
+        self.solutions_dir = solutions_dir
+        self._entries: dict[int, SolutionEntry] | None = None
+
+    @property
+    def entries(self) -> dict[int, SolutionEntry]:
+        if self._entries is None:
+            self._entries = self._scan()
+        return self._entries
+
+    def _scan(self) -> dict[int, SolutionEntry]:
+        entries = {}
+        for path in self.solutions_dir.glob('day*.py'):
+            match = module_name_regex.fullmatch(path.stem)
+            if match is None:
+                continue
+            day = int(match[1])
+            source = path.read_text(encoding='utf8')
+            versions = []
+            for cm in solution_class_regex.finditer(source):
+                if int(cm[2]) == day:
+                    versions.append(cm[3])
+            entries[day] = SolutionEntry(day=day, module_name=path.stem, path=path, versions=tuple(versions),
+                                         has_generator=generator_regex.search(source) is not None)
+        return dict(sorted(entries.items()))
+
+    @property
+    def days(self) -> list[int]:
+        return list(self.entries.keys())
+
+    def get(self, day: int) -> SolutionEntry | None:
+        return self.entries.get(day)
+
+    def has_version(self, day: int, version: str | None) -> bool:
+        entry = self.get(day)
+        return entry is not None and (version or None) in entry.versions
+
+
+def measure_import_times(module_name: str, solutions_dir: Path) -> dict[str, tuple[int, int]]:
+    # Imports the module in a fresh interpreter with `-X importtime`, so shared modules like `common` are measured
+    # cold every time. Returns {module: (self_us, cumulative_us)} for every module that got imported.
+    import subprocess
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {solutions_dir.name}.{module_name}'],
+                          capture_output=True, text=True, cwd=solutions_dir.resolve().parent)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue    # header line
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
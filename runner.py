@@ -0,0 +1,1128 @@
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import redirect_stdout, contextmanager, nullcontext
+from functools import partial
+from importlib import import_module
+from io import StringIO
+from pathlib import Path
+from types import ModuleType, NoneType
+from typing import Literal, Dict, Type, NamedTuple, Iterable, Iterator, Sequence, Callable, TextIO, TYPE_CHECKING
+
+from common import Day, ParsedDay, StreamingDay, BytesInput, line_iterator, collect_spans, count_calls, BACKENDS, \
+    BACKEND_ENV_VAR, get_backend, set_backend
+from registry import SolutionRegistry, measure_import_times
+
+if TYPE_CHECKING:
+    # the rest is imported where it's used, only some options need it and `import runner` should stay cheap
+    from gcstats import GCStats
+    from isolation import IsolatedResult
+    from memo import MemoCacheStats
+    from parse_cache import ParseCache
+
+
+dir_names = {'inputs': 'inputs', 'solutions': 'solutions', 'cache': '.cache'}
+
+
+def generate_new_day(args: list[str]):
+    if len(args) < 1:
+        print('Error: must specify day number')
+        return
+    try:
+        day_num = int(args[0])
+    except ValueError:
+        print(f'Error: day number must be an integer ({args[0]})')
+        return
+    py_path = Path(dir_names['solutions'], f'day{day_num}.py')
+    in_path = Path(dir_names['inputs'], f'd{day_num}.txt')
+    tm_path = Path('day_template')
+    if py_path.exists():
+        print(f'Error: {py_path} already exists!')
+        return
+    with tm_path.open(mode='rt', encoding='utf8', newline='\n') as ft,\
+         py_path.open(mode='wt', encoding='utf8', newline='\n') as fp:
+        fp.write(ft.read().replace('{{day_num}}', str(day_num)))
+    # the real input, the example from the puzzle text and its answers, one per line
+    example_path = Path(dir_names['inputs'], f'd{day_num}_example.txt')
+    for path in (in_path, example_path, expected_answers_path(example_path)):
+        if path.exists():
+            print(f'Warning: {path} already exists, it will not be recreated')
+        else:
+            path.touch(exist_ok=True)
+
+
+registry = SolutionRegistry(Path(dir_names['solutions']))
+
+
+def discover_days() -> list[int]:
+    return registry.days
+
+
+def load_solution(day: int, version: str = None, s_module: str | ModuleType = None, s_class: str | Type[Day] = None,
+                  s_inst_kwargs: Dict = None) -> Day:
+    if isinstance(s_class, (str, NoneType)):
+        if not isinstance(s_module, ModuleType):
+            if s_module is None:
+                s_module = f'day{day}'
+            s_module = import_module(f'{dir_names["solutions"]}.{s_module}')
+        if s_class is None:
+            s_class = f'Day{day}'
+            if version:
+                s_class += f'V_{version}'
+        s_class = getattr(s_module, s_class)
+    day_class: Type[Day] = s_class
+    # noinspection PyArgumentList
+    return day_class(**({} if s_inst_kwargs is None else s_inst_kwargs))
+
+
+def load_generator(day: int) -> Callable[..., str] | None:
+    # generate_input(size: int, rng: Random) from the solution module
+    entry = registry.get(day)
+    if entry is None or not entry.has_generator:
+        return None
+    return import_module(f'{dir_names["solutions"]}.{entry.module_name}').generate_input
+
+
+def generate_input(args: list[str]):
+    day: int | None = None
+    size: int | None = None
+    seed = 0
+    out_path: Path | None = None
+    args_iter = iter(args)
+    for arg in args_iter:
+        arg = arg.lower()
+        if arg == '--seed':
+            seed = int(next(args_iter))
+        elif arg == '--out':
+            out_path = Path(next(args_iter))
+        elif arg.startswith('d'):
+            day = int(arg[1:])
+        else:
+            size = int(arg)
+    if day is None or size is None:
+        print('Error: must specify day and size (e.g. "generate d14 500")')
+        return
+    generator = load_generator(day)
+    if generator is None:
+        print(f'Error: day {day} has no input generator')
+        return
+    from random import Random
+    try:
+        generated = generator(size, Random(seed))
+    except NotImplementedError:
+        print(f'Error: the input generator of day {day} is not implemented yet')
+        return
+    if out_path is None:
+        sys.stdout.write(generated)
+    else:
+        with out_path.open(mode='wt', encoding='utf8', newline='\n') as f:
+            f.write(generated)
+
+
+def input_path(day: int, input_file: str = None, path_prefix: str = '') -> Path:
+    if input_file is None:
+        input_file = f'd{day}.txt'
+    return Path(path_prefix, dir_names['inputs'], input_file)
+
+
+def example_input_file(day: int, path_prefix: str = '') -> str:
+    # the day's own example from `main.py new`, or the one shared by the older days
+    day_file = f'd{day}_example.txt'
+    return day_file if input_path(day=day, input_file=day_file, path_prefix=path_prefix).is_file() else \
+        'example_input.txt'
+
+
+def expected_answers_path(in_path: Path) -> Path:
+    return in_path.with_name(f'{in_path.stem}_expected.txt')
+
+
+def load_expected_answers(in_path: Path) -> dict[int, str]:
+    # part -> answer, from the answer to part 1 on the first line and to part 2 on the second, either left blank while
+    # it isn't known
+    path = expected_answers_path(in_path)
+    if not path.is_file():
+        return {}
+    with path.open(mode='rt', encoding='utf8', newline='\n') as f:
+        lines = list(line_iterator(f))
+    return {part: line.strip() for part, line in zip((1, 2), lines) if line.strip()}
+
+
+def check_expected_answer(result: 'PuzzleRunResult', expected_answers: dict[int, str],
+                          in_path: Path) -> 'PuzzleRunResult':
+    # turns a solve that got an answer other than the known one into an error
+    expected = expected_answers.get(result.part)
+    if result.status == 'ok' and expected is not None and str(result.answer) != expected:
+        return result._replace(status='error', error=f'answer {result.answer} does not match the expected {expected} '
+                                                     f'from "{expected_answers_path(in_path)}"')
+    return result
+
+
+def solution_source_paths(day: int, s_module: str | ModuleType = None, s_class: str | Type[Day] = None,
+                          s_instance: Day = None, path_prefix: str = '') -> list[Path]:
+    # files whose contents determine the answer, resolved without importing the solution module if possible
+    if s_instance is not None:
+        s_class = type(s_instance)
+    if isinstance(s_class, type):
+        module_path = Path(sys.modules[s_class.__module__].__file__)
+    elif isinstance(s_module, ModuleType):
+        module_path = Path(s_module.__file__)
+    else:
+        module_path = Path(path_prefix, dir_names['solutions'], f'{s_module or f"day{day}"}.py')
+    return [module_path, Path(sys.modules[Day.__module__].__file__)]
+
+
+def profile_dump_path(day: int, part: int, version: str = None, suffix: str = 'pstats', path_prefix: str = '') -> Path:
+    profile_name = f'd{day}p{part}' if version is None else f'd{day}p{part}_{version}'
+    return Path(path_prefix, dir_names['cache'], 'profiles', f'{profile_name}.{suffix}')
+
+
+def solution_class_name(day: int, version: str = None, s_class: str | Type[Day] = None, s_instance: Day = None) -> str:
+    if s_instance is not None:
+        return type(s_instance).__name__
+    if isinstance(s_class, type):
+        return s_class.__name__
+    if s_class is not None:
+        return s_class
+    return f'Day{day}V_{version}' if version else f'Day{day}'
+
+
+def parse_cache_for(s_instance: Day, day: int, input_bytes: BytesInput,
+                    path_prefix: str = '') -> tuple['ParseCache', str] | None:
+    # only solutions that know how to dump and load their parsed input set PARSED_FORMAT
+    if not isinstance(s_instance, ParsedDay) or s_instance.PARSED_FORMAT is None:
+        return None
+    from parse_cache import ParseCache
+    cache = ParseCache(Path(path_prefix, dir_names['cache'], 'parsed'))
+    return cache, cache.make_key(day=day, class_name=type(s_instance).__name__, input_bytes=input_bytes,
+                                 source_paths=solution_source_paths(day=day, s_instance=s_instance,
+                                                                    path_prefix=path_prefix),
+                                 parsed_format=s_instance.PARSED_FORMAT)
+
+
+@contextmanager
+def open_input(in_path: Path, mmap_input: bool = False, as_text: bool = False) -> Iterator[BytesInput | str]:
+    # as_text for when nothing needs to hash the raw bytes, so they never sit in memory next to the decoded text
+    if not mmap_input:
+        if as_text:
+            with in_path.open(mode='rt', encoding='utf8', newline='\n') as f:
+                text = f.read()
+            yield text
+        else:
+            yield in_path.read_bytes()
+        return
+    from mmap import mmap, ACCESS_READ
+    with in_path.open(mode='rb') as f:
+        try:
+            mm = mmap(f.fileno(), 0, access=ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            mm = None
+    if mm is None:
+        yield b''
+        return
+    with mm:
+        yield mm
+
+
+class SolveOutput(NamedTuple):
+    output: str
+    elapsed: float
+    cpu_elapsed: float
+    parse_elapsed: float | None     # only set for the solve that triggered the parse
+    # high-water mark of the solving process, bytes. It only ever goes up, in a long-lived process it covers everything
+    # solved there before too.
+    peak_rss: int | None
+    phases: dict[str, tuple[float, int]] | None = None     # span name -> (seconds, times entered)
+    memo_caches: list['MemoCacheStats'] | None = None
+    counters: dict[str, int] | None = None                  # calls of the common.py primitives, by name
+    gc: 'GCStats | None' = None
+    parse_cached: bool = False      # the parse was loaded from the parse cache
+    traced_peak_mem: int | None = None      # peak of what the solve itself allocated, bytes, with trace_memory only
+
+
+class PartSolver:
+    # Solves parts of one puzzle against one input. ParsedDay solutions get parsed only once, and prepare_parsed() is
+    # counted as part of each solve. StreamingDay solutions read lines straight from stream_path if it's given.
+    # With a parse cache and key from parse_cache_for(), the parsed input is loaded from there when it can be and
+    # stored there when it had to be parsed.
+    def __init__(self, s_instance: Day, puzzle_input: str | BytesInput | None, stream_path: Path = None,
+                 parse_cache: tuple['ParseCache', str] | None = None):
+        self.s_instance = s_instance
+        self.puzzle_input = puzzle_input
+        self.stream_path = stream_path
+        self.parse_cache = parse_cache
+        self.parsed = None
+        self.parse_time: float | None = None
+        self.parse_cached = False
+
+    @property
+    def has_parse_stage(self) -> bool:
+        return isinstance(self.s_instance, ParsedDay)
+
+    def parse(self) -> float:
+        if self.parse_time is None:
+            s_instance: ParsedDay = self.s_instance
+            start_time = time.time()
+            cached = None if self.parse_cache is None else self.parse_cache[0].get(self.parse_cache[1])
+            if cached is not None:
+                self.parsed = s_instance.load_parsed(cached)
+                self.parse_cached = True
+            else:
+                self.parsed = s_instance.parse(self.puzzle_input)
+            self.parse_time = time.time() - start_time
+            if self.parse_cache is not None and not self.parse_cached:
+                # before any solve gets to change it
+                cache, key = self.parse_cache
+                cache.put(key, s_instance.dump_parsed(self.parsed))
+        return self.parse_time
+
+    @property
+    def streams(self) -> bool:
+        return self.stream_path is not None and isinstance(self.s_instance, StreamingDay)
+
+    def solve_method(self, part: Literal[1, 2]) -> Callable[[], str]:
+        s_instance = self.s_instance
+        if self.streams:
+            # noinspection PyUnresolvedReferences
+            solve_stream = s_instance.solve_stream_part1 if part == 1 else s_instance.solve_stream_part2
+
+            def solve_from_file() -> str:
+                with self.stream_path.open(mode='rt', encoding='utf8', newline='\n') as f:
+                    return solve_stream(line_iterator(f))
+            return solve_from_file
+        if isinstance(s_instance, ParsedDay):
+            self.parse()
+            solve_parsed = s_instance.solve_parsed_part1 if part == 1 else s_instance.solve_parsed_part2
+            return lambda: solve_parsed(s_instance.prepare_parsed(self.parsed))
+        solve_method = s_instance.solve_part1 if part == 1 else s_instance.solve_part2
+        # noinspection PyArgumentList
+        return lambda: solve_method(input_str=self.puzzle_input)
+
+    def solve(self, part: Literal[1, 2], wrap: Callable[[Callable[[], str]], str] = None, spans: bool = False,
+              memo: bool = False, counters: bool = False, gc_stats: bool = False,
+              gc_mode: str = None, trace_memory: bool = False) -> SolveOutput:
+        # memoization caches of the solution get cleared before and after every solve, so each one starts cold and
+        # long-running processes don't hold on to everything that was ever solved
+        from memo import find_memo_caches, clear_memo_caches, memo_cache_stats, record_cached_properties
+        from isolation import peak_rss_bytes
+        if gc_stats or gc_mode is not None:
+            from gcstats import collect_gc_pauses, tuned_gc
+        memo_caches = find_memo_caches(type(self.s_instance))
+        clear_memo_caches(memo_caches)
+        parsed_before = self.parse_time is not None
+        phases = None
+        # counting starts before the parse, so the first part also gets the grids and lines the parse went through
+        with count_calls() if counters else nullcontext() as counts, \
+                record_cached_properties(memo_caches) if memo else nullcontext() as property_values:
+            solve_method = self.solve_method(part)
+            # frozen after the parse and before the timer starts, the collection of what the solve left behind is
+            # timed along with it
+            with tuned_gc(gc_mode) if gc_mode is not None else nullcontext() as restore_gc, \
+                    collect_gc_pauses() if gc_stats else nullcontext() as gc_pauses, \
+                    collect_spans() if spans else nullcontext() as span_times:
+                start_time, start_cpu = time.time(), time.process_time()
+                traced_peak = None
+                if trace_memory:
+                    from profiling import trace_memory_call
+                    output, traced_peak = trace_memory_call(solve_method)
+                else:
+                    output = solve_method() if wrap is None else wrap(solve_method)
+                if restore_gc is not None:
+                    restore_gc()
+                elapsed_time, cpu_time = time.time() - start_time, time.process_time() - start_cpu
+        if span_times is not None:
+            # None rather than empty when the solution has no spans, same as without --spans
+            phases = span_times.as_dict() or None
+            if phases is not None:
+                phases['(other)'] = (max(elapsed_time - span_times.top_level, 0.0), 1)
+        memo_stats = memo_cache_stats(memo_caches, property_values) if memo else None
+        clear_memo_caches(memo_caches)
+        return SolveOutput(output, elapsed_time, cpu_time, None if parsed_before else self.parse_time,
+                           peak_rss_bytes(), phases, memo_stats, None if counts is None else dict(counts),
+                           None if gc_pauses is None else gc_pauses.stats(gc_mode),
+                           self.parse_cached and not parsed_before, traced_peak)
+
+    def solve_isolated(self, part: Literal[1, 2], timeout: float = None, max_mem: int = None,
+                       **solve_kwargs) -> 'IsolatedResult':
+        # Runs solve() in a forked child, value of an 'ok' result is its SolveOutput, and peak memory is the child's
+        # own. The parsed input can't be handed back to the parent, so every isolated part parses again, and a runaway
+        # parse gets killed the same way as a runaway solve.
+        from isolation import run_isolated
+        return run_isolated(partial(self.solve, part, **solve_kwargs), timeout=timeout, max_mem=max_mem)
+
+
+class PuzzleRunResult(NamedTuple):
+    day: int
+    part: int
+    answer: str | None
+    elapsed: float
+    error: str | None = None
+    cached: bool = False
+    parse_elapsed: float | None = None
+    status: str = 'ok'      # 'ok', 'error', or for isolated runs 'timeout', 'memory' and 'crashed'
+    version: str | None = None
+    cpu_elapsed: float | None = None
+    input_file: str | None = None
+    input_size: int | None = None       # bytes
+    peak_rss: int | None = None         # of the whole solving process, not per solve, see SolveOutput
+    phases: dict[str, tuple[float, int]] | None = None
+    memo_caches: list['MemoCacheStats'] | None = None
+    counters: dict[str, int] | None = None
+    gc: 'GCStats | None' = None
+    gc_baseline: 'GCStats | None' = None      # of a solve with the default collector, when solved with another gc mode
+    gc_baseline_elapsed: float | None = None
+    parse_cached: bool = False
+    traced_peak_mem: int | None = None      # bytes allocated by the solve at its peak, when solved with --mem
+
+    @classmethod
+    def from_output(cls, day: int, part: int, out: SolveOutput, **kwargs) -> 'PuzzleRunResult':
+        if not isinstance(out.output, str):
+            kwargs.update(answer=None, error=f'solution output is of invalid type: {type(out.output)}', status='error')
+        return cls(**{'day': day, 'part': part, 'answer': out.output, 'elapsed': out.elapsed,
+                      'parse_elapsed': out.parse_elapsed, 'cpu_elapsed': out.cpu_elapsed, 'peak_rss': out.peak_rss,
+                      'phases': out.phases, 'memo_caches': out.memo_caches, 'counters': out.counters, 'gc': out.gc,
+                      'parse_cached': out.parse_cached, 'traced_peak_mem': out.traced_peak_mem, **kwargs})
+
+    @classmethod
+    def from_isolated(cls, day: int, part: int, isolated: 'IsolatedResult', **kwargs) -> 'PuzzleRunResult':
+        if isolated.status == 'ok':
+            return cls.from_output(day, part, isolated.value, **kwargs)
+        return cls(day, part, None, isolated.elapsed, isolated.value, status=isolated.status, **kwargs)
+
+    def as_record(self) -> dict:
+        return {'day': self.day, 'part': self.part, 'version': self.version, 'status': self.status,
+                'answer': self.answer, 'error': self.error, 'cached': self.cached, 'wall_time': self.elapsed,
+                'parse_time': self.parse_elapsed, 'parse_cached': self.parse_cached, 'cpu_time': self.cpu_elapsed,
+                'input_file': self.input_file, 'input_size': self.input_size, 'peak_rss': self.peak_rss,
+                'traced_peak_mem': self.traced_peak_mem,
+                'phases': None if self.phases is None else {name: {'time': t, 'count': c}
+                                                            for name, (t, c) in self.phases.items()},
+                'memo_caches': None if self.memo_caches is None else [m.as_dict() for m in self.memo_caches],
+                'counters': self.counters, 'gc': None if self.gc is None else self.gc.as_dict(),
+                'gc_baseline': None if self.gc_baseline is None else {'wall_time': self.gc_baseline_elapsed,
+                                                                      **self.gc_baseline.as_dict()}}
+
+
+def _write_record(f: TextIO, result: PuzzleRunResult):
+    import json
+    f.write(json.dumps(result.as_record()) + '\n')
+    f.flush()
+
+
+@contextmanager
+def jsonl_output(target: str | None) -> Iterator[Callable[[PuzzleRunResult], None] | None]:
+    # Yields a function that writes one JSON line per result, appended to the file at `target`. With "-" the lines go
+    # to stdout and everything else that gets printed is moved over to stderr, so stdout stays parseable.
+    if target is None:
+        yield None
+    elif target == '-':
+        stdout = sys.stdout
+        with redirect_stdout(sys.stderr):
+            yield partial(_write_record, stdout)
+    else:
+        with open(target, mode='at', encoding='utf8', newline='\n') as f:
+            yield partial(_write_record, f)
+
+
+def print_phases(phases: dict[str, tuple[float, int]], elapsed: float):
+    print(f'{"phase":<20} {"time":>9} {"share":>6} {"count":>8}')
+    for name, (total, count) in sorted(phases.items(), key=lambda p: p[1][0], reverse=True):
+        share = total / elapsed * 100 if elapsed > 0 else 0.0
+        print(f'{name:<20} {total:>8.3f}s {share:>5.1f}% {count:>8}')
+
+
+def print_memo_caches(stats: list['MemoCacheStats']):
+    print(f'{"cache":<45} {"hits":>9} {"misses":>9} {"hit rate":>8} {"entries":>9} {"size":>11}')
+    for m in stats:
+        hits = '' if m.hits is None else m.hits
+        misses = '' if m.misses is None else m.misses
+        hit_rate = '' if m.hit_rate is None else f'{m.hit_rate * 100:.1f}%'
+        print(f'{m.name:<45} {hits:>9} {misses:>9} {hit_rate:>8} {m.entries:>9} {m.size / 1024:>8.0f}KiB')
+
+
+def print_counters(counters: dict[str, int]):
+    print(f'{"counter":<25} {"count":>12}')
+    for name, count in sorted(counters.items(), key=lambda c: c[1], reverse=True):
+        print(f'{name:<25} {count:>12}')
+
+
+def print_gc_stats(gc_stats: 'GCStats', elapsed: float):
+    collections = '/'.join(str(c) for c in gc_stats.collections)
+    print(f'GC ({gc_stats.mode or "default"}): {collections} collections by generation, '
+          f'{gc_stats.pause_time:.3f}s paused ({gc_stats.pause_time / elapsed * 100 if elapsed > 0 else 0.0:.1f}%), '
+          f'longest {gc_stats.max_pause * 1000:.1f}ms, {gc_stats.collected} objects collected')
+
+
+def run_puzzle(day: int, part: Literal[1, 2] | Sequence[Literal[1, 2]], version: str = None,
+               s_module: str | ModuleType = None, s_class: str | Type[Day] = None, s_inst_kwargs: Dict = None,
+               s_instance: Day = None, input_file: str = None, path_prefix: str = '', use_cache: bool = True,
+               refresh_cache: bool = False, profile: bool = False, profile_top: int = 20, trace_memory: bool = False,
+               mmap_input: bool = False, stream_input: bool = False, isolate: bool = False, timeout: float = None,
+               max_mem: int = None, sample: bool = False, sample_interval: float = 0.005,
+               spans: bool = False, memo: bool = False, counters: bool = False, gc_stats: bool = False,
+               gc_mode: str = None, parse_cache: bool = False) -> list[PuzzleRunResult]:
+    # Prints every answer and returns one result per part, in order.
+    # timeout (seconds) and max_mem (bytes) only apply to isolated runs, where every part is solved in a child process
+    isolate = isolate or timeout is not None or max_mem is not None
+    parts: tuple[Literal[1, 2], ...] = (part,) if isinstance(part, int) else tuple(part)
+    for p in parts:
+        if p not in (1, 2):
+            raise ValueError(f'Invalid part: {p}')
+
+    if input_file is not None:
+        print(f'using alternative input file "{input_file}"')
+    in_path = input_path(day=day, input_file=input_file, path_prefix=path_prefix)
+    if not in_path.is_file():
+        print(f'Error: no input file found at "{in_path}"')
+        return [PuzzleRunResult(day, p, None, 0.0, f'no input file found at "{in_path}"', status='error',
+                                version=version, input_file=str(in_path)) for p in parts]
+    expected_answers = load_expected_answers(in_path)
+    results = []
+    # Streaming solutions never see input_bytes, it's only hashed for the answer and parse caches. Read as text when
+    # neither cache is used, otherwise the bytes are dropped as soon as they've been hashed.
+    with open_input(in_path, mmap_input=mmap_input or stream_input,
+                    as_text=not (use_cache or parse_cache)) as input_bytes:
+        result_fields = {'version': version, 'input_file': str(in_path), 'input_size': in_path.stat().st_size}
+        cache, cache_keys = None, {}
+        if use_cache:
+            from answer_cache import AnswerCache
+            cache = AnswerCache(Path(path_prefix, dir_names['cache'], 'answers'))
+            class_name = solution_class_name(day=day, version=version, s_class=s_class, s_instance=s_instance)
+            source_paths = solution_source_paths(day=day, s_module=s_module, s_class=s_class, s_instance=s_instance,
+                                                 path_prefix=path_prefix)
+            for p in parts:
+                cache_keys[p] = cache.make_key(day=day, part=p, input_bytes=input_bytes, class_name=class_name,
+                                               source_paths=source_paths,
+                                               extra=repr(sorted((s_inst_kwargs or {}).items())))
+
+        # a cached answer has nothing to report for any of these
+        instrumented = profile or trace_memory or sample or spans or memo or counters or gc_stats or gc_mode
+        solver: PartSolver | None = None
+        for part in parts:
+            print(f'Solving day {day} part {part}', '' if version is None else f' ({version})', sep='')
+            # answers that are known get checked against a fresh solve every time
+            if cache is not None and not refresh_cache and not instrumented and part not in expected_answers:
+                cached_answer = cache.get(cache_keys[part])
+                if cached_answer is not None:
+                    print('Done (cached), printing answer')
+                    print('=======================')
+                    print(cached_answer)
+                    print('=======================')
+                    results.append(PuzzleRunResult(day, part, cached_answer, 0.0, cached=True, **result_fields))
+                    continue
+
+            if solver is None:
+                if s_instance is None:
+                    s_instance = load_solution(day=day, version=version, s_module=s_module, s_class=s_class,
+                                               s_inst_kwargs=s_inst_kwargs)
+                if stream_input and isinstance(s_instance, StreamingDay):
+                    puzzle_input = None
+                elif isinstance(input_bytes, str):
+                    puzzle_input = input_bytes
+                elif isinstance(input_bytes, bytes) or not s_instance.BYTES_INPUT:
+                    if not isinstance(input_bytes, bytes):
+                        print(f'Warning: {type(s_instance).__name__} does not accept '
+                              f'{"streamed" if stream_input else "bytes"} input, decoding the whole file')
+                    puzzle_input = str(input_bytes, 'utf8')
+                else:
+                    puzzle_input = input_bytes
+                solver = PartSolver(s_instance, puzzle_input, stream_path=in_path if stream_input else None,
+                                    parse_cache=parse_cache_for(s_instance, day, input_bytes, path_prefix)
+                                    if parse_cache else None)
+                # both caches have their keys by now, a memory map stays open for BYTES_INPUT solutions
+                if isinstance(input_bytes, bytes):
+                    input_bytes = None
+            wrap: Callable[[Callable[[], str]], str] | None = None
+            if profile:
+                from profiling import profile_call
+                wrap = partial(profile_call, dump_path=profile_dump_path(day, part, version, path_prefix=path_prefix),
+                               top_n=profile_top)
+            elif sample:
+                from profiling import sample_call
+                wrap = partial(sample_call, dump_path=profile_dump_path(day, part, version, suffix='collapsed',
+                                                                        path_prefix=path_prefix),
+                               interval=sample_interval, top_n=profile_top)
+
+            def solve_part(**solve_kwargs) -> PuzzleRunResult:
+                if isolate:
+                    return PuzzleRunResult.from_isolated(day, part, solver.solve_isolated(
+                        part, timeout=timeout, max_mem=max_mem, **solve_kwargs), **result_fields)
+                return PuzzleRunResult.from_output(day, part, solver.solve(part, **solve_kwargs), **result_fields)
+
+            first, baseline = None, None
+            if gc_mode is not None:
+                # the same solve with the default collector to compare against, alternating with the gc mode, and a
+                # warm-up solve of each first so neither one runs cold while the other one doesn't
+                print(f'Solving with the default collector and with gc mode "{gc_mode}" once each to warm up, then '
+                      f'again to compare')
+                if not solver.has_parse_stage or solver.streams:
+                    print(f'Note: {type(solver.s_instance).__name__} has no separate parse stage here, the collector '
+                          f'gets frozen before the solve and the input is parsed with gc mode "{gc_mode}" active')
+                for run_gc_mode in (None, gc_mode, None):
+                    baseline = solve_part(gc_stats=True, gc_mode=run_gc_mode)
+                    first = first or baseline
+                    if baseline.status != 'ok':
+                        break
+            if baseline is not None and baseline.status != 'ok':
+                result = baseline
+            else:
+                result = solve_part(wrap=wrap, spans=spans, memo=memo, counters=counters,
+                                    gc_stats=gc_stats or gc_mode is not None, gc_mode=gc_mode,
+                                    trace_memory=trace_memory and wrap is None)
+                if baseline is not None:
+                    result = result._replace(parse_elapsed=first.parse_elapsed, parse_cached=first.parse_cached,
+                                             gc_baseline=baseline.gc,
+                                             gc_baseline_elapsed=baseline.elapsed)
+                    if result.status == 'ok' and result.answer != baseline.answer:
+                        result = result._replace(status='error', error=f'answer with gc mode "{gc_mode}" '
+                                                                        f'({result.answer}) differs from the default '
+                                                                        f'collector\'s ({baseline.answer})')
+            expected = expected_answers.get(part)
+            result = check_expected_answer(result, expected_answers, in_path)
+            results.append(result)
+            if result.parse_elapsed is not None:
+                print(f'Parsed in {result.parse_elapsed:.3f}s', ' (from cache)' if result.parse_cached else '', sep='')
+            if result.status == 'ok':
+                if cache is not None:
+                    cache.put(cache_keys[part], result.answer, day=day, part=part, elapsed=result.elapsed)
+                print(f'Done in {result.elapsed:.3f}s, printing answer')
+                if result.phases:
+                    print_phases(result.phases, result.elapsed)
+                if result.memo_caches:
+                    print_memo_caches(result.memo_caches)
+                if result.counters:
+                    print_counters(result.counters)
+                if result.gc_baseline is not None:
+                    print_gc_stats(result.gc_baseline, result.gc_baseline_elapsed)
+                if result.gc is not None:
+                    print_gc_stats(result.gc, result.elapsed)
+                if result.gc_baseline is not None and result.elapsed > 0:
+                    print(f'{result.gc_baseline_elapsed:.3f}s with the default collector, '
+                          f'{result.gc_baseline_elapsed / result.elapsed:.2f}x speedup with gc mode "{gc_mode}"')
+                print('=======================')
+                print(result.answer)
+                print('=======================')
+                if expected is not None:
+                    print('Matches the expected answer')
+            elif result.status == 'error':
+                print(f'Error: {result.error}')
+            else:
+                print(f'Error: {result.error} ({result.status})')
+    return results
+
+
+# Parallel runs
+
+def load_timing_history() -> dict[str, float]:
+    path = Path(dir_names['cache'], 'timings.json')
+    if not path.is_file():
+        return {}
+    import json
+    with path.open(mode='rt', encoding='utf8') as f:
+        return json.load(f)
+
+
+def save_timing_history(results: Iterable[PuzzleRunResult]):
+    history = load_timing_history()
+    for r in results:
+        # a timeout is a lower bound, still good enough to get the day scheduled early next time
+        if r.status in ('ok', 'timeout') and not r.cached:
+            history[f'd{r.day}p{r.part}'] = r.elapsed + (r.parse_elapsed or 0.0)
+    path = Path(dir_names['cache'], 'timings.json')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    import json
+    with path.open(mode='wt', encoding='utf8', newline='\n') as f:
+        json.dump(history, f, indent=2, sort_keys=True)
+
+
+def load_fastest_variants() -> dict[str, str | None]:
+    # written by the compare command, maps "d<N>p<M>" to the fastest version (None for the unversioned class)
+    path = Path(dir_names['cache'], 'variants.json')
+    if not path.is_file():
+        return {}
+    import json
+    with path.open(mode='rt', encoding='utf8') as f:
+        return json.load(f)
+
+
+def save_fastest_variants(variants: dict[str, str | None]):
+    path = Path(dir_names['cache'], 'variants.json')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    import json
+    with path.open(mode='wt', encoding='utf8', newline='\n') as f:
+        json.dump(variants, f, indent=2, sort_keys=True)
+
+
+def _solve_parts(solver: PartSolver, day: int, parts: Iterable[Literal[1, 2]], isolate: bool = False,
+                 timeout: float = None, max_mem: int = None, sample_interval: float = None, spans: bool = False,
+                 **result_fields) -> list[PuzzleRunResult]:
+    isolate = isolate or timeout is not None or max_mem is not None
+    results = []
+    # some solutions print debug output, keep it from interleaving with other workers
+    with redirect_stdout(StringIO()):
+        for part in parts:
+            wrap = None
+            if sample_interval is not None:
+                from profiling import sample_call
+                dump_path = profile_dump_path(day, part, result_fields.get('version'), suffix='collapsed')
+                wrap = partial(sample_call, dump_path=dump_path, interval=sample_interval, quiet=True)
+            try:
+                if isolate:
+                    # isolated parts parse on their own, so each one gets its own parse time
+                    results.append(PuzzleRunResult.from_isolated(day, part, solver.solve_isolated(
+                        part, timeout=timeout, max_mem=max_mem, wrap=wrap, spans=spans), **result_fields))
+                else:
+                    results.append(PuzzleRunResult.from_output(day, part, solver.solve(part, wrap=wrap, spans=spans),
+                                                               **result_fields))
+            except Exception as e:
+                results.append(PuzzleRunResult(day, part, None, 0.0, f'{type(e).__name__}: {e}', status='error',
+                                               **result_fields))
+    return results
+
+
+def _solve_in_worker(day: int, parts: tuple[Literal[1, 2], ...], input_file: str | None, use_cache: bool = True,
+                     refresh_cache: bool = False, version: str = None, timeout: float = None,
+                     max_mem: int = None, sample_interval: float = None, spans: bool = False,
+                     parse_cache: bool = False, isolate: bool = False) -> list[PuzzleRunResult]:
+    in_path = input_path(day=day, input_file=input_file)
+    result_fields = {'version': version, 'input_file': str(in_path)}
+    if not in_path.is_file():
+        return [PuzzleRunResult(day, p, None, 0.0, f'no input file found at "{in_path}"', status='error',
+                                **result_fields) for p in parts]
+    results = []
+    try:
+        expected_answers = load_expected_answers(in_path)
+        result_fields['input_size'] = in_path.stat().st_size
+        # the bytes are only needed for the cache keys, see run_puzzle
+        input_bytes = in_path.read_bytes() if use_cache or parse_cache else None
+        from answer_cache import AnswerCache
+        cache = AnswerCache(Path(dir_names['cache'], 'answers')) if use_cache else None
+        cache_keys = {}
+        pending = []
+        for part in parts:
+            if cache is not None:
+                cache_keys[part] = cache.make_key(day=day, part=part,
+                                                  class_name=solution_class_name(day=day, version=version),
+                                                  input_bytes=input_bytes, source_paths=solution_source_paths(day=day),
+                                                  extra=repr([]))
+                # answers that are known get checked against a fresh solve every time, as in run_puzzle
+                skip_cache = refresh_cache or sample_interval is not None or spans or part in expected_answers
+                cached_answer = None if skip_cache else cache.get(cache_keys[part])
+                if cached_answer is not None:
+                    results.append(PuzzleRunResult(day, part, cached_answer, 0.0, cached=True, **result_fields))
+                    continue
+            pending.append(part)
+        if not pending:
+            return results
+        s_instance = load_solution(day=day, version=version)
+        if input_bytes is None:
+            with in_path.open(mode='rt', encoding='utf8', newline='\n') as f:
+                puzzle_input = f.read()
+        else:
+            puzzle_input = input_bytes.decode('utf8')
+        solver = PartSolver(s_instance, puzzle_input,
+                            parse_cache=parse_cache_for(s_instance, day, input_bytes) if parse_cache else None)
+        input_bytes = puzzle_input = None
+        for r in _solve_parts(solver, day, pending, isolate=isolate, timeout=timeout, max_mem=max_mem,
+                              sample_interval=sample_interval, spans=spans, **result_fields):
+            r = check_expected_answer(r, expected_answers, in_path)
+            if cache is not None and r.status == 'ok':
+                cache.put(cache_keys[r.part], r.answer, day=day, part=r.part, elapsed=r.elapsed)
+            results.append(r)
+    except Exception as e:
+        done = {r.part for r in results}
+        results.extend(PuzzleRunResult(day, p, None, 0.0, f'{type(e).__name__}: {e}', status='error',
+                                       **result_fields) for p in parts if p not in done)
+    return results
+
+
+def print_results_table(results: list[PuzzleRunResult]):
+    print(f'{"day":>4} {"part":>4} {"parse":>9} {"time":>9}  answer')
+    for r in sorted(results, key=lambda x: (x.day, x.part)):
+        if r.status == 'ok':
+            answer = r.answer
+        elif r.status == 'timeout':
+            answer = f'Timeout: {r.error}'
+        else:
+            answer = f'Error: {r.error}'
+        parse_elapsed = '' if r.parse_elapsed is None else f'{r.parse_elapsed:.3f}s'
+        elapsed = '(cached)' if r.cached else f'{r.elapsed:.3f}s'
+        print(f'{r.day:>4} {r.part:>4} {parse_elapsed:>9} {elapsed:>9}  {answer}')
+    total_time = sum(r.elapsed + (r.parse_elapsed or 0.0) for r in results)
+    print(f'total solve time: {total_time:.3f}s')
+
+
+def run_all(days: Iterable[int], parts: Iterable[Literal[1, 2]] = (1, 2), input_file: str = None,
+            workers: int = None, use_cache: bool = True, refresh_cache: bool = False,
+            use_fastest: bool = False, timeout: float = None, max_mem: int = None, sample_interval: float = None,
+            spans: bool = False, parse_cache: bool = False, isolate: bool = False,
+            on_result: Callable[[PuzzleRunResult], None] = None) -> list[PuzzleRunResult]:
+    # imported here, it's the most expensive import in this file and single puzzle runs don't need it
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    history = load_timing_history()
+    fastest = load_fastest_variants() if use_fastest else {}
+    # parts of a day that use the same version go to the same worker, so the input only has to be parsed once
+    jobs: dict[tuple[int, str | None], list[Literal[1, 2]]] = {}
+    for d in days:
+        for p in parts:
+            jobs.setdefault((d, fastest.get(f'd{d}p{p}')), []).append(p)
+    # start the historically slowest days first, unknown ones are assumed to be slow
+    job_order = sorted(jobs, key=lambda j: sum(history.get(f'd{j[0]}p{p}', float('inf')) for p in jobs[j]),
+                       reverse=True)
+    print(f'Solving {sum(len(p) for p in jobs.values())} puzzles')
+    start_time = time.time()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_solve_in_worker, d, tuple(jobs[d, v]), input_file, use_cache, refresh_cache, v,
+                                   timeout, max_mem, sample_interval, spans, parse_cache, isolate)
+                   for d, v in job_order]
+        for future in as_completed(futures):
+            results.extend(future.result())
+            if on_result is not None:
+                for r in future.result():
+                    on_result(r)
+    elapsed_time = time.time() - start_time
+    save_timing_history(results)
+    print_results_table(results)
+    failed = Counter(r.status for r in results if r.status != 'ok')
+    if failed:
+        print(f'failed: {", ".join(f"{count} {status}" for status, count in sorted(failed.items()))}')
+    print(f'wall time: {elapsed_time:.3f}s')
+    return results
+
+
+# Batch runs, one day against many inputs
+
+# Solution instance of the current batch pool worker, built once by the parent and inherited (or unpickled)
+_batch_instance: Day | None = None
+
+
+def _init_batch_worker(s_instance: Day):
+    global _batch_instance
+    _batch_instance = s_instance
+
+
+def _solve_batch_file(path: Path, day: int, parts: tuple[Literal[1, 2], ...], version: str = None,
+                      timeout: float = None, max_mem: int = None,
+                      parse_cache: bool = False) -> tuple[Path, list[PuzzleRunResult]]:
+    result_fields = {'version': version, 'input_file': str(path)}
+    try:
+        input_bytes = path.read_bytes()
+        puzzle_input = input_bytes.decode('utf8')
+    except (OSError, ValueError) as e:
+        return path, [PuzzleRunResult(day, p, None, 0.0, f'{type(e).__name__}: {e}', status='error', **result_fields)
+                      for p in parts]
+    solver = PartSolver(_batch_instance, puzzle_input,
+                        parse_cache=parse_cache_for(_batch_instance, day, input_bytes) if parse_cache else None)
+    return path, _solve_parts(solver, day, parts, timeout=timeout, max_mem=max_mem, input_size=len(input_bytes),
+                              **result_fields)
+
+
+def run_batch(day: int, paths: list[Path], parts: Iterable[Literal[1, 2]] = (1, 2), version: str = None,
+              workers: int = None, timeout: float = None, max_mem: int = None, parse_cache: bool = False,
+              on_result: Callable[[PuzzleRunResult], None] = None) -> dict[Path, list[PuzzleRunResult]]:
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    parts = tuple(parts)
+    s_instance = load_solution(day=day, version=version)
+    print(f'Solving day {day} part{"s" if len(parts) > 1 else ""} {", ".join(map(str, parts))}',
+          '' if version is None else f' ({version})', f' against {len(paths)} inputs', sep='')
+    name_width = max((len(p.name) for p in paths), default=0)
+    start_time = time.time()
+    results = {}
+    # every worker gets the instance once, the files are the only thing sent over per job
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(s_instance,)) as executor:
+        futures = [executor.submit(_solve_batch_file, path, day, parts, version, timeout, max_mem, parse_cache)
+                   for path in paths]
+        for future in as_completed(futures):
+            path, file_results = future.result()
+            results[path] = file_results
+            for r in file_results:
+                if r.status == 'ok':
+                    answer = r.answer
+                elif r.status == 'timeout':
+                    answer = f'Timeout: {r.error}'
+                else:
+                    answer = f'Error: {r.error}'
+                print(f'{path.name:<{name_width}} {r.part:>4} {r.elapsed + (r.parse_elapsed or 0.0):>8.3f}s  {answer}',
+                      flush=True)
+                if on_result is not None:
+                    on_result(r)
+    elapsed_time = time.time() - start_time
+    all_results = [r for file_results in results.values() for r in file_results]
+    failed = Counter(r.status for r in all_results if r.status != 'ok')
+    failed_summary = ', '.join(f'{count} {status}' for status, count in sorted(failed.items()))
+    print(f'solved {len(all_results) - sum(failed.values())} of {len(all_results)}',
+          f', failed: {failed_summary}' if failed else '', sep='')
+    print(f'total solve time: {sum(r.elapsed + (r.parse_elapsed or 0.0) for r in all_results):.3f}s')
+    print(f'wall time: {elapsed_time:.3f}s')
+    return results
+
+
+def batch(args: list[str]) -> bool:
+    day: int | None = None
+    parts: list[Literal[1, 2]] = []
+    inputs_dir: Path | None = None
+    version: str | None = None
+    workers: int | None = None
+    timeout: float | None = None
+    max_mem: int | None = None
+    parse_cache = False
+    jsonl_target: str | None = None
+    args_iter = iter(args)
+    for arg in args_iter:
+        if arg == '--inputs':
+            inputs_dir = Path(next(args_iter))
+            continue
+        if arg == '--jsonl':
+            jsonl_target = next(args_iter)
+            continue
+        arg = arg.lower()
+        if arg == '-j':
+            workers = int(next(args_iter))
+        elif arg == '--version':
+            version = next(args_iter)
+        elif arg == '--timeout':
+            timeout = float(next(args_iter))
+        elif arg == '--max-mem':
+            max_mem = int(float(next(args_iter)) * (1 << 20))
+        elif arg == '--parse-cache':
+            parse_cache = True
+        elif arg.startswith('d'):
+            day = int(arg[1:])
+        elif arg.startswith('p'):
+            # noinspection PyTypeChecker
+            part = int(arg[1:])
+            if part not in (1, 2):
+                print(f'Error: part must equal 1 or 2 ({part})')
+                return False
+            if part not in parts:
+                parts.append(part)
+    if day is None or inputs_dir is None:
+        print('Error: must specify a day and an inputs directory (e.g. "batch d12 p2 --inputs dir/")')
+        return False
+    if not registry.has_version(day, version):
+        print(f'Error: no solution found for day {day}' + ('' if version is None else f' version "{version}"'))
+        return False
+    if not inputs_dir.is_dir():
+        print(f'Error: "{inputs_dir}" is not a directory')
+        return False
+    if timeout is not None or max_mem is not None:
+        from isolation import isolation_supported
+        if not isolation_supported():
+            print('Error: --timeout and --max-mem need os.fork, not available on this platform')
+            return False
+    paths = sorted(p for p in inputs_dir.iterdir() if p.is_file())
+    with jsonl_output(jsonl_target) as on_result:
+        results = run_batch(day, paths, parts=parts or (1, 2), version=version, workers=workers, timeout=timeout,
+                            max_mem=max_mem, parse_cache=parse_cache, on_result=on_result)
+    return all(r.status == 'ok' for file_results in results.values() for r in file_results)
+
+
+def parse_day_range(arg: str, available: list[int]) -> list[int]:
+    # accepts "all", "d5" and "d1-d12" (or "d1-12")
+    if arg == 'all':
+        return available
+    first, _, last = arg.partition('-')
+    first = int(first.removeprefix('d'))
+    last = int(last.removeprefix('d')) if last else first
+    return [d for d in available if first <= d <= last]
+
+
+def list_solutions(args: list[str]):
+    import_times = '--import-times' in args
+    if import_times:
+        print(f'{"day":>4}  {"classes":<30} {"common":>10} {"module":>10} {"total":>10}')
+    else:
+        print(f'{"day":>4}  classes')
+    for entry in registry.entries.values():
+        classes = ', '.join(entry.class_names)
+        if entry.has_generator:
+            classes += ' +gen'
+        if not import_times:
+            print(f'{entry.day:>4}  {classes}')
+            continue
+        times = measure_import_times(entry.module_name, Path(dir_names['solutions']))
+        common_us = times.get(Day.__module__, (0, 0))[0]
+        module_us = times.get(f'{dir_names["solutions"]}.{entry.module_name}', (0, 0))
+        print(f'{entry.day:>4}  {classes:<30} {common_us / 1000:>8.2f}ms {module_us[0] / 1000:>8.2f}ms '
+              f'{module_us[1] / 1000:>8.2f}ms')
+    if import_times:
+        print('common: self time of common.py (Direction enum, DIRECTIONS_INVERSES, class bodies), module: self time '
+              'of the solution module (module-level regexes, tables, class bodies), total: cumulative import of the '
+              'solution module including stdlib dependencies')
+
+
+def run(args: list[str]):
+    day = 1
+    days: list[int] | None = None
+    parts: list[Literal[1, 2]] = []
+    example_input = False
+    workers: int | None = None
+    use_cache, refresh_cache = True, False
+    profile, profile_top = False, 20
+    trace_memory = False
+    mmap_input = False
+    stream_input = False
+    version: str | None = None
+    use_fastest = False
+    isolate = False
+    timeout: float | None = None
+    max_mem: int | None = None
+    sample, sample_interval = False, 0.005
+    spans = False
+    memo = False
+    counters = False
+    gc_stats = False
+    gc_mode: str | None = None
+    parse_cache = False
+    backend: str | None = None
+    record_history = False
+    jsonl_target: str | None = None
+    args_iter = iter(args)
+    for arg in args_iter:
+        if arg == '--jsonl':
+            # file to append records to, or "-" for stdout
+            jsonl_target = next(args_iter)
+            continue
+        arg = arg.lower()
+        if arg == '-j':
+            workers = int(next(args_iter))
+        elif arg == '--profile':
+            profile = True
+        elif arg == '--profile-top':
+            profile_top = int(next(args_iter))
+        elif arg == '--sample':
+            sample = True
+        elif arg == '--sample-interval':
+            # milliseconds
+            sample, sample_interval = True, float(next(args_iter)) / 1000
+        elif arg == '--spans':
+            spans = True
+        elif arg == '--memo':
+            memo = True
+        elif arg == '--counters':
+            counters = True
+        elif arg == '--gc':
+            gc_stats = True
+        elif arg == '--gc-mode':
+            # freeze after the parse, then "tuned" or "off"
+            gc_mode = next(args_iter).lower()
+            from gcstats import GC_MODES
+            if gc_mode not in GC_MODES:
+                print(f'Error: gc mode must be one of {", ".join(GC_MODES)} ({gc_mode})')
+                return
+        elif arg == '--mem':
+            trace_memory = True
+        elif arg == '--mmap':
+            mmap_input = True
+        elif arg == '--stream':
+            stream_input = True
+        elif arg == '--version':
+            version = next(args_iter)
+        elif arg == '--fastest':
+            use_fastest = True
+        elif arg == '--isolate':
+            isolate = True
+        elif arg == '--timeout':
+            timeout = float(next(args_iter))
+        elif arg == '--max-mem':
+            # megabytes
+            max_mem = int(float(next(args_iter)) * (1 << 20))
+        elif arg == '--no-cache':
+            use_cache = False
+        elif arg == '--parse-cache':
+            parse_cache = True
+        elif arg == '--backend':
+            backend = next(args_iter).lower()
+            if backend not in BACKENDS:
+                print(f'Error: backend must be one of {", ".join(BACKENDS)} ({backend})')
+                return
+        elif arg == '--history':
+            # opt-in, single runs shouldn't pay for sqlite3 and git on every start
+            record_history = True
+        elif arg == '--refresh':
+            refresh_cache = True
+        elif arg == 'all' or (arg.startswith('d') and '-' in arg):
+            days = parse_day_range(arg, discover_days())
+        elif arg.startswith('d'):
+            day = int(arg[1:])
+        elif arg.startswith('p'):
+            # noinspection PyTypeChecker
+            part = int(arg[1:])
+            if part not in (1, 2):
+                print(f'Error: part must equal 1 or 2 ({part})')
+                return
+            if part not in parts:
+                parts.append(part)
+        elif arg == 'e':
+            example_input = True
+    in_file = None
+    if example_input:
+        # run all takes one input file name for every day
+        in_file = 'example_input.txt' if days is not None else example_input_file(day)
+    if isolate or timeout is not None or max_mem is not None:
+        from isolation import isolation_supported
+        if not isolation_supported():
+            print('Error: --isolate, --timeout and --max-mem need os.fork, not available on this platform')
+            return
+    wrapping_flags = [flag for flag, given in (('--profile', profile), ('--sample', sample), ('--mem', trace_memory))
+                      if given]
+    if len(wrapping_flags) > 1:
+        # each of them wraps the solve on its own, only one can be used at a time
+        print(f'Error: {" and ".join(wrapping_flags)} cannot be used together')
+        return
+    if days is not None:
+        # run all only passes --sample, --spans and the cache, isolation and timeout options on to its workers
+        single_day_flags = [flag for flag, given in (('--profile', profile), ('--mem', trace_memory),
+                                                     ('--mmap', mmap_input), ('--stream', stream_input),
+                                                     ('--memo', memo), ('--counters', counters),
+                                                     ('--gc', gc_stats), ('--gc-mode', gc_mode is not None),
+                                                     ('--version', version is not None)) if given]
+        if single_day_flags:
+            print(f'Error: {", ".join(single_day_flags)} only supported when solving a single day'
+                  + (', use --fastest to pick versions for run all' if version is not None else ''))
+            return
+    if days is None and registry.get(day) is None:
+        print(f'Error: no solution found for day {day}')
+        return
+    if backend is not None:
+        # the environment variable carries it into worker processes that don't fork
+        os.environ[BACKEND_ENV_VAR] = set_backend(backend)
+    # instrumented timings aren't comparable to anything, and history keeps one series per version, whatever backend
+    # it ran on
+    record_history = record_history and not (profile or trace_memory or sample or spans or memo or counters or
+                                             gc_stats or gc_mode or get_backend().name != 'python')
+    with jsonl_output(jsonl_target) as on_result:
+        if days is not None:
+            results = run_all(days=days, parts=parts or (1, 2), input_file=in_file, workers=workers,
+                              use_cache=use_cache, refresh_cache=refresh_cache, use_fastest=use_fastest,
+                              timeout=timeout, max_mem=max_mem, sample_interval=sample_interval if sample else None,
+                              spans=spans, parse_cache=parse_cache, isolate=isolate, on_result=on_result)
+            if record_history:
+                # imported here, sqlite3 isn't needed until everything is solved
+                from history import record_run_results
+                record_run_results('run_all', results)
+            return
+        fastest = load_fastest_variants() if use_fastest and version is None else {}
+        parts_by_version: dict[str | None, list[Literal[1, 2]]] = {}
+        for part in parts or [1]:
+            parts_by_version.setdefault(version or fastest.get(f'd{day}p{part}'), []).append(part)
+        for part_version, version_parts in parts_by_version.items():
+            if not registry.has_version(day, part_version):
+                print(f'Error: day {day} has no version "{part_version}" '
+                      f'(available: {", ".join(registry.get(day).class_names)})')
+                continue
+            results = run_puzzle(day=day, part=version_parts, version=part_version, input_file=in_file,
+                                 use_cache=use_cache, refresh_cache=refresh_cache, profile=profile,
+                                 profile_top=profile_top, trace_memory=trace_memory, mmap_input=mmap_input,
+                                 stream_input=stream_input, isolate=isolate, timeout=timeout, max_mem=max_mem,
+                                 sample=sample, sample_interval=sample_interval, spans=spans, memo=memo,
+                                 counters=counters, gc_stats=gc_stats, gc_mode=gc_mode, parse_cache=parse_cache)
+            if on_result is not None:
+                for r in results:
+                    on_result(r)
+            if record_history:
+                from history import record_run_results
+                record_run_results('run', results)
+
@@ -0,0 +1,218 @@
+import json
+import os
+import signal
+import socket
+import socketserver
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from threading import Lock, Event
+
+from common import Day
+from runner import dir_names, registry, load_solution, PartSolver, PuzzleRunResult
+
+
+# Protocol: newline-delimited JSON over a Unix stream socket. A request is
+#   {"id": <anything>, "day": 12, "part": 2, "input": "<puzzle input>"}
+# with "input_path" instead of "input" to have the worker read the file itself, and optional "version", "timeout"
+# (seconds) and "max_mem" (bytes). Requests on one connection are solved concurrently and every response
+#   {"id": ..., "day": 12, "part": 2, "answer": "...", "elapsed": 0.1, "parse_elapsed": null, "cpu_elapsed": 0.1,
+#    "peak_rss": 20000000, "status": "ok", "error": null}
+# is written as soon as it is done, so responses can arrive out of order. "error" is set when status is not "ok".
+# "peak_rss" is the high-water mark of the process that solved it, the server itself unless it had a timeout or max_mem.
+
+default_socket_path = Path(dir_names['cache'], 'solver.sock')
+
+# Warm solution instances of the current pool worker, by (day, version)
+_instances: dict[tuple[int, str | None], Day] = {}
+
+
+def _get_instance(day: int, version: str | None) -> Day:
+    key = (day, version or None)
+    s_instance = _instances.get(key)
+    if s_instance is None:
+        s_instance = _instances[key] = load_solution(day=day, version=version)
+    return s_instance
+
+
+def _warm_worker(days: list[int]):
+    # ctrl-c goes to the whole process group, leave it to the server to shut the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # import every solution module and build every class up front, so the first request for a day doesn't pay for it
+    for day in days:
+        for version in registry.get(day).versions:
+            _get_instance(day, version)
+
+
+def _serve_solve(day: int, part: int, version: str | None, puzzle_input: str | None, in_path: str | None,
+                 timeout: float | None, max_mem: int | None) -> dict:
+    if puzzle_input is None:
+        puzzle_input = Path(in_path).read_text(encoding='utf8')
+    solver = PartSolver(_get_instance(day, version), puzzle_input)
+    with redirect_stdout(StringIO()):
+        if timeout is not None or max_mem is not None:
+            result = PuzzleRunResult.from_isolated(day, part, solver.solve_isolated(part, timeout=timeout,
+                                                                                    max_mem=max_mem))
+        else:
+            result = PuzzleRunResult.from_output(day, part, solver.solve(part))
+    return {'answer': result.answer, 'elapsed': result.elapsed, 'parse_elapsed': result.parse_elapsed,
+            'cpu_elapsed': result.cpu_elapsed, 'peak_rss': result.peak_rss, 'status': result.status,
+            'error': result.error}
+
+
+class SolveRequestHandler(socketserver.StreamRequestHandler):
+    server: 'SolverServer'
+
+    def setup(self):
+        super().setup()
+        self.write_lock = Lock()
+
+    def respond(self, response: dict):
+        data = json.dumps(response).encode('utf8') + b'\n'
+        with self.write_lock:
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                pass    # client went away, nothing left to tell it
+
+    def submit(self, request: dict) -> Event:
+        request_id = request.get('id')
+        try:
+            day, part = int(request['day']), int(request['part'])
+            version = request.get('version')
+            if part not in (1, 2):
+                raise ValueError(f'invalid part: {part}')
+            if not registry.has_version(day, version):
+                raise ValueError(f'no solution for day {day}' + ('' if version is None else f' version "{version}"'))
+            if ('input' in request) == ('input_path' in request):
+                raise ValueError('need exactly one of "input" and "input_path"')
+            timeout = None if request.get('timeout') is None else float(request['timeout'])
+            max_mem = None if request.get('max_mem') is None else int(request['max_mem'])
+        except (KeyError, TypeError, ValueError) as e:
+            self.respond({'id': request_id, 'status': 'error', 'error': f'bad request: {e}'})
+            done = Event()
+            done.set()
+            return done
+        future = self.server.executor.submit(_serve_solve, day, part, version, request.get('input'),
+                                             request.get('input_path'), timeout, max_mem)
+        done = Event()
+        future.add_done_callback(lambda f: self.on_done(f, {'id': request_id, 'day': day, 'part': part,
+                                                            'version': version}, done))
+        return done
+
+    def on_done(self, future: Future, response: dict, done: Event):
+        try:
+            response.update(future.result())
+        except Exception as e:
+            response.update({'answer': None, 'status': 'error', 'error': f'{type(e).__name__}: {e}'})
+        self.respond(response)
+        done.set()
+
+    def handle(self):
+        pending = []
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                self.respond({'id': None, 'status': 'error', 'error': f'bad request: {e}'})
+                continue
+            if not isinstance(request, dict):
+                self.respond({'id': None, 'status': 'error', 'error': 'bad request: not an object'})
+                continue
+            pending.append(self.submit(request))
+        # client is done sending, answer everything it asked for before closing
+        for done in pending:
+            done.wait()
+
+
+class SolverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, executor: ProcessPoolExecutor):
+        self.executor = executor
+        super().__init__(str(socket_path), SolveRequestHandler)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(args: list[str]):
+    socket_path = default_socket_path
+    workers: int | None = None
+    args_iter = iter(args)
+    for arg in args_iter:
+        if arg == '--socket':
+            socket_path = Path(next(args_iter))
+        elif arg == '-j':
+            workers = int(next(args_iter))
+    if not hasattr(socket, 'AF_UNIX'):
+        print('Error: unix sockets are not available on this platform')
+        return
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        # left behind by a server that didn't shut down cleanly
+        socket_path.unlink()
+    days = registry.days
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker, initargs=(days,)) as executor, \
+         SolverServer(socket_path, executor) as server:
+        # workers are started on demand, get all of them started and warmed up before the first request comes in
+        for future in [executor.submit(int) for _ in range(workers)]:
+            future.result()
+        # stop the same way as on ctrl-c when asked to by a process manager
+        signal.signal(signal.SIGTERM, _interrupt)
+        print(f'Serving {len(days)} days on "{socket_path}" with {workers} workers (pid {os.getpid()})')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print('Shutting down')
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def submit(args: list[str]):
+    # one-off client, mostly for checking on a running server
+    socket_path = default_socket_path
+    request = {'id': 0, 'day': 1, 'part': 1}
+    args_iter = iter(args)
+    for arg in args_iter:
+        if arg == '--socket':
+            socket_path = Path(next(args_iter))
+        elif arg == '--input':
+            request['input_path'] = str(Path(next(args_iter)).resolve())
+        elif arg == '--version':
+            request['version'] = next(args_iter)
+        elif arg == '--timeout':
+            request['timeout'] = float(next(args_iter))
+        elif arg.startswith('d'):
+            request['day'] = int(arg[1:])
+        elif arg.startswith('p'):
+            request['part'] = int(arg[1:])
+    if 'input_path' not in request:
+        request['input_path'] = str(Path(dir_names['inputs'], f'd{request["day"]}.txt').resolve())
+    start_time = time.time()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError as e:
+            print(f'Error: could not connect to "{socket_path}" ({e})')
+            return
+        sock.sendall(json.dumps(request).encode('utf8') + b'\n')
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile(mode='rb') as f:
+            response = json.loads(f.readline())
+    round_trip = time.time() - start_time
+    if response['status'] != 'ok':
+        print(f'Error: {response["error"]} ({response["status"]})')
+        return
+    parse_elapsed = '' if response['parse_elapsed'] is None else f'parsed in {response["parse_elapsed"]:.3f}s, '
+    print(f'Done in {response["elapsed"]:.3f}s ({parse_elapsed}round trip {round_trip:.3f}s), printing answer')
+    print('=======================')
+    print(response['answer'])
+    print('=======================')
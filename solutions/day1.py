@@ -1,19 +1,22 @@
-from typing import Iterable
+from typing import Iterable, TYPE_CHECKING
 
-from common import Day, line_iterator
+from common import StreamingDay
+
+if TYPE_CHECKING:
+    from random import Random
 
 
 DIGIT_NAMES = ['zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
 
 
-class Day1(Day):
+class Day1(StreamingDay):
     DIGITS = [str(i) for i in range(0, 10)]
     DIGITS_WITH_NAMES = {str(i): i for i in range(0, 10)}
     DIGITS_WITH_NAMES.update({n: i for i, n in enumerate(DIGIT_NAMES)})
 
-    def solve_part1(self, input_str: str) -> str:
+    def solve_stream_part1(self, lines: Iterable[str]) -> str:
         result = 0
-        for line in line_iterator(input_str):
+        for line in lines:
             line_digits = [c for c in line if c in self.DIGITS]
             result += int(line_digits[0] + line_digits[-1])
         return str(result)
@@ -27,16 +30,27 @@ class Day1(Day):
                     return cls.DIGITS_WITH_NAMES[dn]
         return None
 
-    def solve_part2(self, input_str: str) -> str:
+    def solve_stream_part2(self, lines: Iterable[str]) -> str:
         max_len = max((len(s) for s in self.DIGITS_WITH_NAMES.keys()))
         result = 0
-        for line in line_iterator(input_str):
+        for line in lines:
             first_digit = self.find_a_digit(line, range(0, len(line), 1), max_len)
             last_digit = self.find_a_digit(line, range(len(line) - 1, -1, -1), max_len)
             result += int(str(first_digit) + str(last_digit))
         return str(result)
 
 
+def generate_input(size: int, rng: 'Random') -> str:
+    # size is the number of lines, every line gets at least one numeric digit
+    lines = []
+    for _ in range(size):
+        tokens = [rng.choice(DIGIT_NAMES[1:]) if rng.random() < 0.3 else rng.choice('abcdefghijklmnopqrstuvwxyz')
+                  for _ in range(rng.randint(2, 12))]
+        tokens.insert(rng.randint(0, len(tokens)), str(rng.randint(1, 9)))
+        lines.append(''.join(tokens))
+    return '\n'.join(lines) + '\n'
+
+
 if __name__ == '__main__':
     from main import run_puzzle
     run_puzzle(day=1, part=1, s_class=Day1, path_prefix='..')
@@ -1,6 +1,6 @@
 from typing import Tuple, Literal, Iterable, Sequence, Iterator
 
-from common import Day, Vector, Direction, DIRECTIONS_CARDINAL, line_iterator, Grid, GT
+from common import ParsedDay, Vector, Direction, DIRECTIONS_CARDINAL, line_iterator, Grid, GT
 
 
 PipeMapMark = Literal['|', '-', 'L', 'J', '7', 'F', '.', 'S']
@@ -79,7 +79,7 @@ class OutOfBoundsError(RuntimeError):
     pass
 
 
-class Day10(Day):
+class Day10(ParsedDay[Tuple[PipeMap, Vector]]):
     @staticmethod
     def parse_input(input_str: str) -> Tuple[PipeMap, Vector]:
         pipe_map = PipeMap()
@@ -95,6 +95,9 @@ class Day10(Day):
             raise RuntimeError('no starting position found')
         return pipe_map, start_pos
 
+    def parse(self, input_str: str) -> Tuple[PipeMap, Vector]:
+        return self.parse_input(input_str)
+
     @staticmethod
     def walk_loop(pipe_map: PipeMap, start_pos: Vector, start_direction: Direction)\
             -> Iterator[Tuple[Direction, Vector]]:
@@ -130,8 +133,8 @@ class Day10(Day):
             found.add(c_pos)
             loose_ends.extend(c_pos + d for d in DIRECTIONS_CARDINAL)
 
-    def solve_part1(self, input_str: str) -> str:
-        pipe_map, start_pos = self.parse_input(input_str)
+    def solve_parsed_part1(self, parsed: Tuple[PipeMap, Vector]) -> str:
+        pipe_map, start_pos = parsed
         start_connections = list(pipe_map.get_verified_connected_tiles(pos=start_pos))
         if len(start_connections) != 2:
             raise RuntimeError('start has more than 2 connections!')
@@ -144,8 +147,8 @@ class Day10(Day):
                 cur_dist += 1
         return str(max(loop_tiles.values()))
 
-    def solve_part2(self, input_str: str) -> str:
-        pipe_map, start_pos = self.parse_input(input_str)
+    def solve_parsed_part2(self, parsed: Tuple[PipeMap, Vector]) -> str:
+        pipe_map, start_pos = parsed
         start_directions = list(sd for sd, _ in pipe_map.get_verified_connected_tiles(pos=start_pos))
         loop_tiles: set[Vector] = {start_pos}
         loop_tiles.update(p for d, p in self.walk_loop(pipe_map=pipe_map, start_pos=start_pos,
@@ -189,5 +192,4 @@ class Day10(Day):
 
 if __name__ == '__main__':
     from main import run_puzzle
-    run_puzzle(day=10, part=1, s_class=Day10, path_prefix='..')
-    run_puzzle(day=10, part=2, s_class=Day10, path_prefix='..')
+    run_puzzle(day=10, part=(1, 2), s_class=Day10, path_prefix='..')
@@ -1,8 +1,11 @@
 from bisect import bisect_left
 from itertools import combinations
-from typing import Iterator, Tuple
+from typing import Iterator, Tuple, TYPE_CHECKING
 
-from common import Day, line_iterator, Grid, Vector
+from common import ParsedDay, line_iterator, Grid, Vector
+
+if TYPE_CHECKING:
+    from random import Random
 
 
 class Galaxy:
@@ -36,7 +39,7 @@ class GalaxyGrid(Grid[Galaxy | None]):
     #     self._width += 1
 
 
-class Day11(Day):
+class Day11(ParsedDay[Tuple[GalaxyGrid, list[Galaxy]]]):
     @staticmethod
     def parse_input(input_str: str) -> Tuple[GalaxyGrid, list[Galaxy]]:
         gid = 0
@@ -55,6 +58,14 @@ class Day11(Day):
             grid.add_line(galaxies_line)
         return grid, galaxies
 
+    def parse(self, input_str: str) -> Tuple[GalaxyGrid, list[Galaxy]]:
+        return self.parse_input(input_str)
+
+    def prepare_parsed(self, parsed: Tuple[GalaxyGrid, list[Galaxy]]) -> Tuple[GalaxyGrid, list[Galaxy]]:
+        # adjust_coordinates() moves galaxies in place, the grid itself is only checked for empty cells
+        grid, galaxies = parsed
+        return grid, [Galaxy(g.id, Vector(g.location.x, g.location.y)) for g in galaxies]
+
     @staticmethod
     def adjust_coordinates(grid: GalaxyGrid, galaxies: list[Galaxy], ex_fac: int):
         ex_fac -= 1
@@ -71,18 +82,22 @@ class Day11(Day):
             result += (g1.location - g2.location).manhattan_distance
         return result
 
-    def solve_part1(self, input_str: str) -> str:
-        grid, galaxies = self.parse_input(input_str)
+    def solve_parsed_part1(self, parsed: Tuple[GalaxyGrid, list[Galaxy]]) -> str:
+        grid, galaxies = parsed
         self.adjust_coordinates(grid=grid, galaxies=galaxies, ex_fac=2)
         return str(self.do_math(galaxies=galaxies))
 
-    def solve_part2(self, input_str: str) -> str:
-        grid, galaxies = self.parse_input(input_str)
+    def solve_parsed_part2(self, parsed: Tuple[GalaxyGrid, list[Galaxy]]) -> str:
+        grid, galaxies = parsed
         self.adjust_coordinates(grid=grid, galaxies=galaxies, ex_fac=1000000)
         return str(self.do_math(galaxies=galaxies))
 
 
+def generate_input(size: int, rng: 'Random') -> str:
+    # size is the side of a square image, about 2% of it are galaxies
+    return ''.join(''.join('#' if rng.random() < 0.02 else '.' for _ in range(size)) + '\n' for _ in range(size))
+
+
 if __name__ == '__main__':
     from main import run_puzzle
-    run_puzzle(day=11, part=1, s_class=Day11, path_prefix='..')
-    run_puzzle(day=11, part=2, s_class=Day11, path_prefix='..')
+    run_puzzle(day=11, part=(1, 2), s_class=Day11, path_prefix='..')
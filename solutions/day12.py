@@ -1,16 +1,20 @@
 from bisect import bisect_left
 from functools import cache
-from typing import Iterator, Callable
+from typing import Iterator, Callable, Iterable, TYPE_CHECKING
 
-from common import Day, line_iterator
+from common import StreamingDay, span
+
+if TYPE_CHECKING:
+    from random import Random
 
 
 class SpringRecordRow:
     def __init__(self, line: str, damaged_criteria: list[int]):
         self.ln = tuple(line)
         self.damaged_criteria = damaged_criteria
-        self.valid_placements: dict[int, list[int]] = {cgs: list(self.iter_cg_placements_all(cgs, 0))
-                                                       for cgs in set(damaged_criteria)}
+        with span('placements'):
+            self.valid_placements: dict[int, list[int]] = {cgs: list(self.iter_cg_placements_all(cgs, 0))
+                                                           for cgs in set(damaged_criteria)}
 
     # Unused methods
     # @property
@@ -64,13 +68,16 @@ class SpringRecordRow:
         return any(self.ln[i] == '#' for i in range(start, end))
 
 
-class Day12(Day):
+class Day12(StreamingDay):
     @staticmethod
-    def iter_input(input_str: str, unfold_func: Callable[[str, str], tuple[str, str]]) -> Iterator[SpringRecordRow]:
-        for line in line_iterator(input_str):
-            rl, dc = line.split(' ', maxsplit=1)    # type: str, str
-            rl, dc = unfold_func(rl, dc)
-            yield SpringRecordRow(line=rl, damaged_criteria=[int(n.strip()) for n in dc.split(',')])
+    def iter_input(lines: Iterable[str], unfold_func: Callable[[str, str], tuple[str, str]])\
+            -> Iterator[SpringRecordRow]:
+        for line in lines:
+            with span('parse'):
+                rl, dc = line.split(' ', maxsplit=1)    # type: str, str
+                rl, dc = unfold_func(rl, dc)
+                damaged_criteria = [int(n.strip()) for n in dc.split(',')]
+            yield SpringRecordRow(line=rl, damaged_criteria=damaged_criteria)
 
     @classmethod
     @cache
@@ -84,21 +91,38 @@ class Day12(Day):
             result += cls.count_arrangements(record, cg_num + 1, cgp + record.damaged_criteria[cg_num] + 1)
         return result
 
-    def solve_part1(self, input_str: str) -> str:
+    def solve_stream_part1(self, lines: Iterable[str]) -> str:
         result = 0
-        for record in self.iter_input(input_str, lambda x, y: (x, y)):
-            arr = self.count_arrangements(record=record)
+        for record in self.iter_input(lines, lambda x, y: (x, y)):
+            with span('count'):
+                arr = self.count_arrangements(record=record)
             result += arr
         return str(result)
 
-    def solve_part2(self, input_str: str) -> str:
+    def solve_stream_part2(self, lines: Iterable[str]) -> str:
         result = 0
-        for record in self.iter_input(input_str, lambda x, y: ('?'.join([x] * 5), ','.join([y] * 5))):
-            arr = self.count_arrangements(record=record)
+        for record in self.iter_input(lines, lambda x, y: ('?'.join([x] * 5), ','.join([y] * 5))):
+            with span('count'):
+                arr = self.count_arrangements(record=record)
             result += arr
         return str(result)
 
 
+def generate_input(size: int, rng: 'Random') -> str:
+    # size is the number of records. Each one is built from a real arrangement of at most 27 springs, then some of
+    # them get hidden behind '?', so there's always at least one valid arrangement
+    lines = []
+    for _ in range(size):
+        groups = [rng.randint(1, 3) for _ in range(rng.randint(1, 5))]
+        springs = ['#' * groups[0]]
+        for g in groups[1:]:
+            springs.append('.' * rng.randint(1, 2) + '#' * g)
+        row = '.' * rng.randint(0, 2) + ''.join(springs) + '.' * rng.randint(0, 2)
+        row = ''.join('?' if rng.random() < 0.5 else c for c in row)
+        lines.append(f'{row} {",".join(str(g) for g in groups)}')
+    return '\n'.join(lines) + '\n'
+
+
 if __name__ == '__main__':
     from main import run_puzzle
     run_puzzle(day=12, part=1, s_class=Day12, path_prefix='..')
@@ -1,6 +1,6 @@
 from typing import Iterator
 
-from common import Day, Grid, line_iterator
+from common import Day, Grid, line_iterator, get_backend
 
 
 class Day13(Day):
@@ -66,6 +66,25 @@ class Day13(Day):
         return str(self.do_math(pat_iter=self.iter_input(input_str), smudge_count=1))
 
 
+class Day13V_backend(Day13):
+    # Counts the mismatches of every reflection line on whole arrays, see common.get_backend
+    @classmethod
+    def do_math(cls, pat_iter: Iterator[Grid[str]], smudge_count: int = 0) -> int:
+        backend, result = get_backend(), 0
+        for pat in pat_iter:
+            rows = backend.char_array(pat.lines)
+            columns = backend.transpose(rows)
+            m = 1
+            refl = [i for i in range(1, pat.width) if backend.mirror_mismatches(columns, i) == smudge_count]
+            if not refl:
+                refl = [i for i in range(1, pat.height) if backend.mirror_mismatches(rows, i) == smudge_count]
+                m = 100
+            if len(refl) != 1:
+                raise RuntimeError()
+            result += refl.pop() * m
+        return result
+
+
 if __name__ == '__main__':
     from main import run_puzzle
     run_puzzle(day=13, part=1, s_class=Day13, path_prefix='..')
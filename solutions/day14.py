@@ -1,4 +1,9 @@
-from common import Day, LGrid, Vector, line_iterator, Direction
+from typing import TYPE_CHECKING
+
+from common import ParsedDay, LGrid, Vector, line_iterator, Direction, get_backend, PythonBackend
+
+if TYPE_CHECKING:
+    from random import Random
 
 
 class RockPlatform(LGrid[str]):
@@ -9,6 +14,12 @@ class RockPlatform(LGrid[str]):
                 load += h - p.y
         return load
 
+    def copy(self) -> 'RockPlatform':
+        platform = RockPlatform()
+        for ln in self.lines:
+            platform.add_line(list(ln))
+        return platform
+
     def scan_in_cardinal_dir(self, d: Direction):
         if d.value[1] != 0:
             for y in range(self.height) if d.value[1] > 0 else range(self.height - 1, -1, -1):
@@ -22,7 +33,7 @@ class RockPlatform(LGrid[str]):
                     yield v, self.get_cell(v)
 
 
-class Day14(Day):
+class Day14(ParsedDay[RockPlatform]):
     @staticmethod
     def parse_input(input_str: str) -> RockPlatform:
         platform = RockPlatform()
@@ -30,6 +41,13 @@ class Day14(Day):
             platform.add_line(list(line))
         return platform
 
+    def parse(self, input_str: str) -> RockPlatform:
+        return self.parse_input(input_str)
+
+    def prepare_parsed(self, platform: RockPlatform) -> RockPlatform:
+        # rocks get rolled in place
+        return platform.copy()
+
     @staticmethod
     def roll_rock(platform: RockPlatform, start_vec: Vector, direction: Direction):
         rock = platform.get_cell(start_vec)
@@ -41,26 +59,25 @@ class Day14(Day):
             platform.set_cell(end_vec, rock)
             platform.set_cell(start_vec, '.')
 
-    def solve_part1(self, input_str: str) -> str:
-        platform = self.parse_input(input_str)
-        for pos, val in platform.scan_in_cardinal_dir(Direction.Down):
+    def tilt(self, platform: RockPlatform, direction: Direction):
+        for pos, val in platform.scan_in_cardinal_dir(direction.inverse):
             if val == 'O':
-                self.roll_rock(platform=platform, start_vec=pos, direction=Direction.Up)
+                self.roll_rock(platform=platform, start_vec=pos, direction=direction)
+
+    def solve_parsed_part1(self, platform: RockPlatform) -> str:
+        self.tilt(platform, Direction.Up)
         for ln in platform.lines:
             print(''.join(ln))
         return str(platform.calc_load_north())
 
-    def solve_part2(self, input_str: str) -> str:
-        platform = self.parse_input(input_str)
+    def solve_parsed_part2(self, platform: RockPlatform) -> str:
         spin_dirs = [Direction.Up, Direction.Left, Direction.Down, Direction.Right]
         repetitions_needed = 1
         target_cycle = 1000000000
         cycle_results = []
         for i in range(target_cycle):
             for d in spin_dirs:
-                for p, v in platform.scan_in_cardinal_dir(d.inverse):
-                    if v == 'O':
-                        self.roll_rock(platform, p, d)
+                self.tilt(platform, d)
             cycle_results.append(platform.calc_load_north())
             for rep_len in range(1, len(cycle_results) // repetitions_needed):
                 ref = cycle_results[-rep_len:]
@@ -72,7 +89,47 @@ class Day14(Day):
         return str(cycle_results[-1])
 
 
+class Day14V_fast(Day14):
+    # Same solution, but tilting slides rocks along plain list indexes (PythonBackend.roll) instead of allocating
+    # Vectors for every step
+    def tilt(self, platform: RockPlatform, direction: Direction):
+        PythonBackend.roll(platform.lines, direction, 'O')
+
+
+class BackendRockPlatform:
+    def __init__(self, lines: list[str]):
+        self.backend = get_backend()
+        self.array = self.backend.char_array(lines)
+
+    @property
+    def lines(self) -> list[str]:
+        return self.backend.to_lines(self.array)
+
+    def calc_load_north(self) -> int:
+        h = self.backend.shape(self.array)[0]
+        return sum(count * (h - y) for y, count in enumerate(self.backend.row_counts(self.array, 'O')))
+
+    def copy(self) -> 'BackendRockPlatform':
+        platform = BackendRockPlatform.__new__(BackendRockPlatform)
+        platform.backend, platform.array = self.backend, self.backend.copy(self.array)
+        return platform
+
+
+class Day14V_backend(Day14):
+    # Tilts the whole platform at once with the array backend, see common.get_backend
+    @staticmethod
+    def parse_input(input_str: str) -> BackendRockPlatform:
+        return BackendRockPlatform(list(line_iterator(input_str)))
+
+    def tilt(self, platform: BackendRockPlatform, direction: Direction):
+        platform.array = platform.backend.roll(platform.array, direction, 'O')
+
+
+def generate_input(size: int, rng: 'Random') -> str:
+    # size is the side of a square platform
+    return ''.join(''.join(rng.choices('O#.', weights=(20, 15, 65), k=size)) + '\n' for _ in range(size))
+
+
 if __name__ == '__main__':
     from main import run_puzzle
-    run_puzzle(day=14, part=1, s_class=Day14, path_prefix='..')
-    run_puzzle(day=14, part=2, s_class=Day14, path_prefix='..')
+    run_puzzle(day=14, part=(1, 2), s_class=Day14, path_prefix='..')
@@ -1,7 +1,11 @@
 import re
+from typing import TYPE_CHECKING
 
 from common import Day
 
+if TYPE_CHECKING:
+    from random import Random
+
 
 step_regex = re.compile(r'^(\w+)([-=])(\d)?')
 
@@ -45,6 +49,15 @@ class Day15(Day):
         return str(result)
 
 
+def generate_input(size: int, rng: 'Random') -> str:
+    # size is the number of steps, labels come from a limited pool so that they actually collide
+    labels = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(2, 6))) for _ in range(max(size // 4, 1))]
+    steps = [f'{rng.choice(labels)}-' if rng.random() < 0.3 else f'{rng.choice(labels)}={rng.randint(1, 9)}'
+             for _ in range(size)]
+    # no trailing newline, it would end up in the last step
+    return ','.join(steps)
+
+
 if __name__ == '__main__':
     from main import run_puzzle
     run_puzzle(day=15, part=1, s_class=Day15, path_prefix='..')
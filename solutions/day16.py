@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Iterator, Sequence
+from array import array
+from typing import Callable, Iterator, Sequence, TYPE_CHECKING
 
-from common import Day, Grid, Vector, Direction, line_iterator
+from common import ParsedDay, Grid, Vector, Direction, line_iterator
+
+if TYPE_CHECKING:
+    from random import Random
 
 
 class LightBeam:
@@ -23,6 +27,11 @@ class LightContraptionTile(ABC):
     def beam_hit(self, beam: LightBeam, add_beam: Callable[[LightBeam], None]):
         raise NotImplemented
 
+    @property
+    @abstractmethod
+    def tile_type(self) -> str:
+        raise NotImplemented
+
     @classmethod
     def create(cls, loc: Vector, tile_type: str) -> 'LightContraptionTile':
         if tile_type == '.':
@@ -36,6 +45,10 @@ class LightContraptionTile(ABC):
 class LCTileEmpty(LightContraptionTile):
     __slots__ = []
 
+    @property
+    def tile_type(self) -> str:
+        return '.'
+
     def beam_hit(self, beam: LightBeam, add_beam: Callable[[LightBeam], None]):
         beam.loc += beam.dir
 
@@ -60,6 +73,10 @@ class LCTileMirror(LightContraptionTile):
         super().__init__(loc)
         self.vr = 0 if tile_type == '/' else 1
 
+    @property
+    def tile_type(self) -> str:
+        return '/\\'[self.vr]
+
     def beam_hit(self, beam: LightBeam, add_beam: Callable[[LightBeam], None]):
         beam.dir = self.RDS[self.vr][beam.dir]
         beam.loc += beam.dir
@@ -76,6 +93,10 @@ class LCTileSplitter(LightContraptionTile):
         super().__init__(loc)
         self.v = 0 if tile_type == '|' else 1
 
+    @property
+    def tile_type(self) -> str:
+        return '|-'[self.v]
+
     def beam_hit(self, beam: LightBeam, add_beam: Callable[[LightBeam], None]):
         sd = self.SDS[self.v]
         if beam.dir in sd:
@@ -95,6 +116,11 @@ class LightContraption(Grid[LightContraptionTile]):
         super().add_line(line)
         self.all_tiles.extend(line)
 
+    def reset(self):
+        for t in self.all_tiles:
+            if t.energised_dirs:
+                t.energised_dirs = []
+
     def calc_energised_tiles_and_reset(self) -> int:
         et = 0
         for t in self.all_tiles:
@@ -104,7 +130,9 @@ class LightContraption(Grid[LightContraptionTile]):
         return et
 
 
-class Day16(Day):
+class Day16(ParsedDay[LightContraption]):
+    PARSED_FORMAT = 1
+
     @staticmethod
     def parse_input(input_str: str) -> LightContraption:
         contraption = LightContraption()
@@ -112,6 +140,31 @@ class Day16(Day):
             contraption.add_line([LightContraptionTile.create(Vector(x, y), s) for x, s in enumerate(line)])
         return contraption
 
+    def parse(self, input_str: str) -> LightContraption:
+        return self.parse_input(input_str)
+
+    def dump_parsed(self, contraption: LightContraption) -> tuple[int, bytes]:
+        # width and the tile types, one byte per tile, row by row
+        return contraption.width, array('B', (ord(t.tile_type) for t in contraption.all_tiles)).tobytes()
+
+    def load_parsed(self, data: tuple[int, bytes]) -> LightContraption:
+        width, tile_types = data
+        contraption = LightContraption()
+        if width == 0:
+            return contraption      # empty input, there are no rows to split the tiles into
+        create = LightContraptionTile.create
+        for y, start in enumerate(range(0, len(tile_types), width)):
+            # empty tiles are by far the most common, skip create()'s checks for them
+            row = tile_types[start:start + width].decode('ascii')
+            contraption.add_line([LCTileEmpty(Vector(x, y)) if s == '.' else create(Vector(x, y), s)
+                                  for x, s in enumerate(row)])
+        return contraption
+
+    def prepare_parsed(self, contraption: LightContraption) -> LightContraption:
+        # simulations normally clean up after themselves, this only matters if a previous solve got interrupted
+        contraption.reset()
+        return contraption
+
     @staticmethod
     def simulate(contraption: LightContraption, beams: list[LightBeam]):
         add = beams.append
@@ -140,14 +193,12 @@ class Day16(Day):
         for y in range(contraption.height - 1, -1, -1):
             yield Vector(0, y), Direction.Right
 
-    def solve_part1(self, input_str: str) -> str:
-        contraption = self.parse_input(input_str)
+    def solve_parsed_part1(self, contraption: LightContraption) -> str:
         beams = [LightBeam(location=Vector(0, 0), direction=Direction.Right)]
         self.simulate(contraption=contraption, beams=beams)
         return str(contraption.calc_energised_tiles_and_reset())
 
-    def solve_part2(self, input_str: str) -> str:
-        contraption = self.parse_input(input_str)
+    def solve_parsed_part2(self, contraption: LightContraption) -> str:
         result = 0
         for v, d in self.iter_edge_with_dirs(contraption):
             self.simulate(contraption, [LightBeam(v, d)])
@@ -157,7 +208,11 @@ class Day16(Day):
         return str(result)
 
 
+def generate_input(size: int, rng: 'Random') -> str:
+    # size is the side of a square contraption, about 10% of the tiles are mirrors or splitters
+    return ''.join(''.join(rng.choices('./\\-|', weights=(90, 3, 3, 2, 2), k=size)) + '\n' for _ in range(size))
+
+
 if __name__ == '__main__':
     from main import run_puzzle
-    run_puzzle(day=16, part=1, s_class=Day16, path_prefix='..')
-    run_puzzle(day=16, part=2, s_class=Day16, path_prefix='..')
+    run_puzzle(day=16, part=(1, 2), s_class=Day16, path_prefix='..')
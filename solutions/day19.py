@@ -1,9 +1,10 @@
 import operator
 import re
+from array import array
 from functools import reduce
 from typing import NamedTuple, Literal
 
-from common import Day, line_iterator
+from common import ParsedDay, line_iterator
 
 
 workflow_regex = re.compile(r'(\w+){(.+)}')
@@ -11,6 +12,9 @@ conditional_rule_regex = re.compile(r'(\w)([<>])(\d+):(\w+)')
 simple_rule_regex = re.compile(r'\w+')
 part_regex = re.compile(r'{(?:\w=\d+,?){4}}')
 OPERATORS = {'<': operator.lt, '>': operator.gt}
+# how rules are numbered in the parse cache
+_RULE_CATEGORIES = ('', 'x', 'm', 'a', 's')
+_RULE_OPERATORS = (None, '<', '>')
 
 
 class Day19Part(NamedTuple):
@@ -93,7 +97,9 @@ class Day19Workflow:
         return workflow
 
 
-class Day19(Day):
+class Day19(ParsedDay[tuple[dict[str, Day19Workflow], list[Day19Part]]]):
+    PARSED_FORMAT = 1
+
     @staticmethod
     def parse_input(input_str: str) -> tuple[dict[str, Day19Workflow], list[Day19Part]]:
         workflows: dict[str, Day19Workflow] = {}
@@ -110,8 +116,39 @@ class Day19(Day):
             parts.append(Day19Part(**{rs[0]: int(rs[2:]) for rs in line[1:-1].split(',')}))
         return workflows, parts
 
-    def solve_part1(self, input_str: str) -> str:
-        workflows, parts = self.parse_input(input_str)
+    def parse(self, input_str: str) -> tuple[dict[str, Day19Workflow], list[Day19Part]]:
+        return self.parse_input(input_str)
+
+    def dump_parsed(self, parsed: tuple[dict[str, Day19Workflow], list[Day19Part]]) -> tuple[list, bytes, bytes, bytes]:
+        # Workflow names once, rules packed as (category, operator, value, destination name index) and part ratings 4
+        # per part, all as unsigned shorts. Rule counts tell which rules belong to which workflow.
+        workflows, parts = parsed
+        names = list(workflows) + ['A', 'R']
+        name_index = {name: i for i, name in enumerate(names)}
+        rule_counts = array('H', (len(wf.rules) for wf in workflows.values()))
+        rules = array('H', (n for wf in workflows.values() for r in wf.rules
+                            for n in (_RULE_CATEGORIES.index(r.cat), _RULE_OPERATORS.index(r.opr), r.val,
+                                      name_index[r.destination])))
+        ratings = array('H', (rating for part in parts for rating in part))
+        return names, rule_counts.tobytes(), rules.tobytes(), ratings.tobytes()
+
+    def load_parsed(self, data: tuple[list, bytes, bytes, bytes]) -> tuple[dict[str, Day19Workflow], list[Day19Part]]:
+        names, rule_counts_data, rules_data, ratings_data = data
+        rule_counts, rules, ratings = array('H'), array('H'), array('H')
+        rule_counts.frombytes(rule_counts_data)
+        rules.frombytes(rules_data)
+        ratings.frombytes(ratings_data)
+        workflows: dict[str, Day19Workflow] = {}
+        i = 0
+        for name, rule_count in zip(names, rule_counts):
+            workflows[name] = Day19Workflow(name, [
+                Day19Rule(_RULE_CATEGORIES[rules[j]], _RULE_OPERATORS[rules[j + 1]], rules[j + 2], names[rules[j + 3]])
+                for j in range(i, i + rule_count * 4, 4)])
+            i += rule_count * 4
+        return workflows, [Day19Part(*ratings[i:i + 4]) for i in range(0, len(ratings), 4)]
+
+    def solve_parsed_part1(self, parsed: tuple[dict[str, Day19Workflow], list[Day19Part]]) -> str:
+        workflows, parts = parsed
         first_workflow = workflows['in']
         result = 0
         for part in parts:
@@ -126,8 +163,8 @@ class Day19(Day):
                 wf = workflows[des]
         return str(result)
 
-    def solve_part2(self, input_str: str) -> str:
-        workflows, _ = self.parse_input(input_str)
+    def solve_parsed_part2(self, parsed: tuple[dict[str, Day19Workflow], list[Day19Part]]) -> str:
+        workflows, _ = parsed
         parts: list[tuple[Day19PartHypothetical, str]] = [(Day19PartHypothetical(), 'in')]
         result = 0
         while parts:
@@ -153,5 +190,4 @@ class Day19(Day):
 
 if __name__ == '__main__':
     from main import run_puzzle
-    run_puzzle(day=19, part=1, s_class=Day19, path_prefix='..')
-    run_puzzle(day=19, part=2, s_class=Day19, path_prefix='..')
+    run_puzzle(day=19, part=(1, 2), s_class=Day19, path_prefix='..')
@@ -1,7 +1,10 @@
 import re
-from typing import NamedTuple
+from typing import NamedTuple, Iterable, TYPE_CHECKING
 
-from common import Day, line_iterator
+from common import StreamingDay
+
+if TYPE_CHECKING:
+    from random import Random
 
 
 regex_game_line = re.compile(r'Game (\d+): (.*)')
@@ -19,7 +22,7 @@ class Day2GameRound(NamedTuple):
     draws: list[Day2GameDraw]
 
 
-class Day2(Day):
+class Day2(StreamingDay):
     @staticmethod
     def parse_line(line: str) -> Day2GameRound:
         match = regex_game_line.fullmatch(line)
@@ -34,12 +37,12 @@ class Day2(Day):
                                               blue=colors.get('blue', 0)))
         return g_round
 
-    def solve_part1(self, input_str: str) -> str:
+    def solve_stream_part1(self, lines: Iterable[str]) -> str:
         max_red = 12
         max_green = 13
         max_blue = 14
         result = 0
-        for line in line_iterator(input_str):
+        for line in lines:
             game = self.parse_line(line)
             possible = True
             for draw in game.draws:
@@ -50,15 +53,27 @@ class Day2(Day):
                 result += game.game_id
         return str(result)
 
-    def solve_part2(self, input_str: str) -> str:
+    def solve_stream_part2(self, lines: Iterable[str]) -> str:
         result = 0
-        for line in line_iterator(input_str):
+        for line in lines:
             game = self.parse_line(line)
             min_cubes = [max(d[col] for d in game.draws) for col in range(3)]
             result += min_cubes[0] * min_cubes[1] * min_cubes[2]
         return str(result)
 
 
+def generate_input(size: int, rng: 'Random') -> str:
+    # size is the number of games
+    lines = []
+    for game_id in range(1, size + 1):
+        draws = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(['red', 'green', 'blue'], rng.randint(1, 3))
+            draws.append(', '.join(f'{rng.randint(1, 20)} {c}' for c in colors))
+        lines.append(f'Game {game_id}: {"; ".join(draws)}')
+    return '\n'.join(lines) + '\n'
+
+
 if __name__ == '__main__':
     from main import run_puzzle
     run_puzzle(day=2, part=1, s_class=Day2, path_prefix='..')
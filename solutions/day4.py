@@ -1,6 +1,10 @@
 import re
+from typing import Iterable, TYPE_CHECKING
 
-from common import Day, line_iterator
+from common import StreamingDay
+
+if TYPE_CHECKING:
+    from random import Random
 
 
 line_regex = re.compile(r'Card +(\d+): ([\d ]+) \| ([\d ]+)')
@@ -14,7 +18,7 @@ class Day4Line:
         self.copy_count = 1
 
 
-class Day4(Day):
+class Day4(StreamingDay):
     @staticmethod
     def parse_line(line: str) -> Day4Line:
         match = line_regex.fullmatch(line)
@@ -23,9 +27,9 @@ class Day4(Day):
         y_nums = [int(n) for n in match[3].split(' ') if n]
         return Day4Line(cid, w_nums, y_nums)
 
-    def solve_part1(self, input_str: str) -> str:
+    def solve_stream_part1(self, lines: Iterable[str]) -> str:
         result = 0
-        for line in line_iterator(input_str):
+        for line in lines:
             d4l = self.parse_line(line)
             points = 0
             for n in d4l.your_nums:
@@ -34,8 +38,8 @@ class Day4(Day):
             result += points
         return str(result)
 
-    def solve_part2(self, input_str: str) -> str:
-        d4lines = [self.parse_line(line) for line in line_iterator(input_str)]
+    def solve_stream_part2(self, lines: Iterable[str]) -> str:
+        d4lines = [self.parse_line(line) for line in lines]
         for ci, d4l in enumerate(d4lines):
             matches = sum(1 for n in d4l.your_nums if n in d4l.winning_nums)
             for i in range(ci + 1, min(len(d4lines), ci + 1 + matches), 1):
@@ -43,6 +47,18 @@ class Day4(Day):
         return str(sum(d4l.copy_count for d4l in d4lines))
 
 
+def generate_input(size: int, rng: 'Random') -> str:
+    # size is the number of cards
+    lines = []
+    id_width = len(str(size))
+    for card_id in range(1, size + 1):
+        winning = rng.sample(range(1, 100), 10)
+        yours = rng.sample(range(1, 100), 25)
+        lines.append(f'Card {card_id:>{id_width}}: {" ".join(f"{n:>2}" for n in winning)} | '
+                     f'{" ".join(f"{n:>2}" for n in yours)}')
+    return '\n'.join(lines) + '\n'
+
+
 if __name__ == '__main__':
     from main import run_puzzle
     run_puzzle(day=4, part=1, s_class=Day4, path_prefix='..')
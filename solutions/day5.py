@@ -1,7 +1,8 @@
 import re
+from array import array
 from typing import NamedTuple, Iterator
 
-from common import Day, line_iterator, batch_iterator
+from common import ParsedDay, line_iterator, batch_iterator
 
 
 seeds_regex = re.compile(r'seeds:((:? \d+)+)')
@@ -55,7 +56,9 @@ class Almanac:
         return number
 
 
-class Day5(Day):
+class Day5(ParsedDay[Almanac]):
+    PARSED_FORMAT = 1
+
     @staticmethod
     def parse_input(input_str: str) -> Almanac:
         almanac = Almanac()
@@ -69,8 +72,31 @@ class Day5(Day):
             almanac.conversion_maps[f'{a_map.source}-{a_map.destination}'] = a_map
         return almanac
 
-    def solve_part1(self, input_str: str) -> str:
-        almanac = self.parse_input(input_str)
+    def parse(self, input_str: str) -> Almanac:
+        return self.parse_input(input_str)
+
+    def dump_parsed(self, almanac: Almanac) -> tuple[bytes, list[tuple[str, str, bytes]]]:
+        # numbers packed as 64-bit ints, conversions as (destination start, source start, range) triples
+        return (array('q', almanac.seeds_numbers).tobytes(),
+                [(m.source, m.destination, array('q', (n for c in m.conversions for n in (
+                    c.destination_range.start, c.source_range.start, len(c.source_range)))).tobytes())
+                 for m in almanac.conversion_maps.values()])
+
+    def load_parsed(self, data: tuple[bytes, list[tuple[str, str, bytes]]]) -> Almanac:
+        seeds_data, maps_data = data
+        almanac = Almanac()
+        seeds = array('q')
+        seeds.frombytes(seeds_data)
+        almanac.seeds_numbers = seeds.tolist()
+        for source, destination, conversion_data in maps_data:
+            numbers = array('q')
+            numbers.frombytes(conversion_data)
+            a_map = AlmanacMap(source=source, destination=destination,
+                               conversions=[AlmanacMapConversion(*numbers[i:i + 3]) for i in range(0, len(numbers), 3)])
+            almanac.conversion_maps[f'{source}-{destination}'] = a_map
+        return almanac
+
+    def solve_parsed_part1(self, almanac: Almanac) -> str:
         result = None
         for seed in almanac.seeds_numbers:
             num = almanac.convert_to(number=seed, source_category='seed', destination_category='location')
@@ -78,8 +104,7 @@ class Day5(Day):
                 result = num
         return str(result)
 
-    def solve_part2(self, input_str: str) -> str:
-        almanac = self.parse_input(input_str)
+    def solve_parsed_part2(self, almanac: Almanac) -> str:
         result = None
 
         seed_ranges: list[range] = [range(s, s + l) for s, l in batch_iterator(almanac.seeds_numbers, 2, False)]
@@ -120,5 +145,4 @@ class Day5(Day):
 
 if __name__ == '__main__':
     from main import run_puzzle
-    run_puzzle(day=5, part=1, s_class=Day5, path_prefix='..')
-    run_puzzle(day=5, part=2, s_class=Day5, path_prefix='..')
+    run_puzzle(day=5, part=(1, 2), s_class=Day5, path_prefix='..')
@@ -1,9 +1,12 @@
 from enum import IntEnum
 from functools import cached_property, total_ordering
 from itertools import chain
-from typing import Iterable, Type
+from typing import Iterable, Type, TYPE_CHECKING
 
-from common import Day, line_iterator
+from common import StreamingDay
+
+if TYPE_CHECKING:
+    from random import Random
 
 
 CARDS = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
@@ -92,12 +95,12 @@ class CamelCardsHandPart2(CamelCardsHand):
         return self.type_from_distribution_list(dv)
 
 
-class Day7(Day):
+class Day7(StreamingDay):
     @staticmethod
-    def parse_input(input_str: str, hand_class: Type[CamelCardsHand]) -> list[tuple[CamelCardsHand, int]]:
+    def parse_input(lines: Iterable[str], hand_class: Type[CamelCardsHand]) -> list[tuple[CamelCardsHand, int]]:
         hands_and_bids = []
         hand_strs = set()
-        for line in line_iterator(input_str):
+        for line in lines:
             line = line.split(' ')
             hands_and_bids.append((hand_class(line[0]), int(line[1])))
             if line[0] in hand_strs:
@@ -115,15 +118,29 @@ class Day7(Day):
             result += bid * (i + 1)  # bid * rank
         return result
 
-    def solve_part1(self, input_str: str) -> str:
-        hands_and_bids = self.parse_input(input_str, hand_class=CamelCardsHand)
+    def solve_stream_part1(self, lines: Iterable[str]) -> str:
+        hands_and_bids = self.parse_input(lines, hand_class=CamelCardsHand)
         return str(self.calc_total_winnings(hands_and_bids))
 
-    def solve_part2(self, input_str: str) -> str:
-        hands_and_bids = self.parse_input(input_str, hand_class=CamelCardsHandPart2)
+    def solve_stream_part2(self, lines: Iterable[str]) -> str:
+        hands_and_bids = self.parse_input(lines, hand_class=CamelCardsHandPart2)
         return str(self.calc_total_winnings(hands_and_bids))
 
 
+def generate_input(size: int, rng: 'Random') -> str:
+    # size is the number of hands, hands have to be unique so it's capped at 13^5
+    size = min(size, len(CARDS) ** 5)
+    # hands are kept in draw order, iterating the set would depend on string hashing and differ between processes
+    hands: list[str] = []
+    seen: set[str] = set()
+    while len(hands) < size:
+        hand = ''.join(rng.choices(CARDS, k=5))
+        if hand not in seen:
+            seen.add(hand)
+            hands.append(hand)
+    return ''.join(f'{h} {rng.randint(1, 1000)}\n' for h in hands)
+
+
 if __name__ == '__main__':
     from main import run_puzzle
     run_puzzle(day=7, part=1, s_class=Day7, path_prefix='..')
@@ -1,8 +1,11 @@
 from functools import cached_property
 from itertools import pairwise
-from typing import Iterator
+from typing import Iterator, Iterable, TYPE_CHECKING
 
-from common import Day, line_iterator
+from common import StreamingDay
+
+if TYPE_CHECKING:
+    from random import Random
 
 
 class Day9Sequence:
@@ -30,17 +33,26 @@ class Day9Sequence:
         return self.numbers[0] - prev_increment
 
 
-class Day9(Day):
+class Day9(StreamingDay):
     @staticmethod
-    def iter_input(input_str: str) -> Iterator[Day9Sequence]:
-        for line in line_iterator(input_str):
+    def iter_input(lines: Iterable[str]) -> Iterator[Day9Sequence]:
+        for line in lines:
             yield Day9Sequence(numbers=[int(n.strip()) for n in line.split(' ') if n])
 
-    def solve_part1(self, input_str: str) -> str:
-        return str(sum(seq.predict_next_num() for seq in self.iter_input(input_str)))
+    def solve_stream_part1(self, lines: Iterable[str]) -> str:
+        return str(sum(seq.predict_next_num() for seq in self.iter_input(lines)))
+
+    def solve_stream_part2(self, lines: Iterable[str]) -> str:
+        return str(sum(seq.predict_prev_num() for seq in self.iter_input(lines)))
+
 
-    def solve_part2(self, input_str: str) -> str:
-        return str(sum(seq.predict_prev_num() for seq in self.iter_input(input_str)))
+def generate_input(size: int, rng: 'Random') -> str:
+    # size is the number of sequences, each one is a random polynomial of degree 6 or less sampled at 21 points
+    lines = []
+    for _ in range(size):
+        coefficients = [rng.randint(-5, 5) for _ in range(rng.randint(1, 7))]
+        lines.append(' '.join(str(sum(c * x ** i for i, c in enumerate(coefficients))) for x in range(21)))
+    return '\n'.join(lines) + '\n'
 
 
 if __name__ == '__main__':
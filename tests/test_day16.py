@@ -0,0 +1,15 @@
+from solutions.day16 import Day16
+
+
+def test_parse_cache_round_trip():
+    day = Day16()
+    contraption = day.parse('.|.\n\\.-\n')
+    loaded = day.load_parsed(day.dump_parsed(contraption))
+    assert [[t.tile_type for t in line] for line in loaded.lines] == \
+           [[t.tile_type for t in line] for line in contraption.lines]
+
+
+def test_parse_cache_round_trip_empty_input():
+    day = Day16()
+    loaded = day.load_parsed(day.dump_parsed(day.parse('')))
+    assert loaded.width == 0 and loaded.height == 0